@@ -0,0 +1,70 @@
+"""
+Benchmark for merging the safe regions of large, hand-edited components.
+
+Run with `python benchmarks/bench_safe_regions.py [size in megabytes]` from the root of the repository.
+Compares `merge_safe_regions` with the regular expression based merge that `migrate_ui` used before.
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui_migrations.safe_regions import merge_safe_regions
+
+
+LEGACY_SAFE_REGION_PATTERN = re.compile(
+	r"(\/\* SAFE REGION BEGIN \*\/(.*?)\/\* SAFE REGION END \*\/)|(<!-- SAFE REGION BEGIN -->(.*?)<!-- SAFE REGION END -->)",
+	re.DOTALL
+)
+
+
+def legacy_replace_safe_regions(new_component_code: str, old_component_code: str) -> str:
+	"""The merge that `migrate_ui` used before safe regions were named."""
+	old_safe_regions = list(match.group() for match in LEGACY_SAFE_REGION_PATTERN.finditer(old_component_code))
+	old_safe_regions_iter = iter(old_safe_regions)
+	return LEGACY_SAFE_REGION_PATTERN.sub(lambda _: next(old_safe_regions_iter), new_component_code)
+
+
+def make_component(size: int, region_count: int, named: bool, custom_code: str) -> str:
+	"""Make component code of about `size` characters with `region_count` safe regions that contain `custom_code`."""
+	filler_line = "\t\t<td class=\"dj-data-table__cell\"><span>{{ item['field'] }}</span></td>\n"
+	filler = filler_line * max(1, size // (region_count * len(filler_line)))
+	parts = []
+	for index in range(region_count):
+		name = f" region-{index}" if named else ""
+		parts.append(filler)
+		parts.append(f"/* SAFE REGION BEGIN{name} */\n{custom_code}/* SAFE REGION END */\n")
+	return "".join(parts)
+
+
+def measure(function, *args, repeat: int = 3) -> float:
+	"""Get the best time of `repeat` runs of `function` in seconds."""
+	times = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		function(*args)
+		times.append(time.perf_counter() - start)
+	return min(times)
+
+
+def main() -> None:
+	megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+	size = int(megabytes * 1024 * 1024)
+	for region_count in (10, 1000):
+		# large custom code in the old file makes the lazy `.*?` of the legacy pattern scan a lot
+		old_code = make_component(size, region_count, False, "\tconst custom = 1 /* some comment */\n" * 200)
+		new_code = make_component(size, region_count, True, "\n")
+		legacy_new_code = make_component(size, region_count, False, "\n")
+		merged, _ = merge_safe_regions(new_code, old_code)
+		assert merged.count("const custom") == old_code.count("const custom")
+		print(
+			f"{len(old_code) / 1024 / 1024:.1f} MB, {region_count} safe regions: "
+			f"merge_safe_regions {measure(merge_safe_regions, new_code, old_code) * 1000:.1f} ms, "
+			f"legacy {measure(legacy_replace_safe_regions, legacy_new_code, old_code) * 1000:.1f} ms"
+		)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,273 @@
+"""
+Benchmark suite for the REST endpoints and the code generator, without network access.
+
+Creates a throwaway Django project on SQLite with synthetic models and components in a temporary directory, and measures
+- the latency (p50/p99) and query counts of the list, item, create, patch and delete endpoints,
+- `migrate_ui` runs without any generated files (cold) and without any changes (warm),
+- merging the safe regions of large component files.
+
+Run with `python benchmarks/bench_suite.py [options]` from the root of the repository (see `--help`).
+The results are written as JSON to `benchmarks/results/` (or `--output`), so that they can be compared across commits.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPOSITORY_DIR)
+
+from bench_safe_regions import make_component, measure
+
+
+def write_project(project_dir: str, depth: int, component_count: int) -> None:
+	"""Write a Django app with a chain of `depth` related models below the `Item` model and `component_count` components for it."""
+	app_dir = os.path.join(project_dir, "benchapp")
+	os.makedirs(app_dir)
+	os.makedirs(os.path.join(project_dir, "frontend", "src", "components"))
+	with open(os.path.join(app_dir, "__init__.py"), "w") as f:
+		f.write("")
+
+	models_code = ["from django.db import models\n\n"]
+	models_code.append("class Tag(models.Model):\n\tlabel = models.CharField(max_length=50)\n\n")
+	for level in range(depth, 0, -1):
+		parent = f"\tparent = models.ForeignKey('Level{level + 1}', on_delete=models.CASCADE, null=True)\n" if level < depth else ""
+		models_code.append(f"class Level{level}(models.Model):\n\tname = models.CharField(max_length=50)\n{parent}\n")
+	models_code.append(
+		"class Item(models.Model):\n"
+		"\tSTATUS = [('new', 'New'), ('open', 'Open'), ('closed', 'Closed')]\n"
+		"\ttitle = models.CharField(max_length=100)\n"
+		"\tamount = models.IntegerField(db_index=True)\n"
+		"\tstatus = models.CharField(max_length=10, choices=STATUS, default='new')\n"
+		"\tdone = models.BooleanField(default=False)\n"
+		"\tcreated = models.DateTimeField(auto_now_add=True)\n"
+		"\ttags = models.ManyToManyField(Tag, blank=True)\n"
+		+ ("\tparent = models.ForeignKey(Level1, on_delete=models.CASCADE, null=True)\n" if depth else "")
+	)
+	with open(os.path.join(app_dir, "models.py"), "w") as f:
+		f.write("".join(models_code))
+
+	fields = ["id", "title", "amount", "status", "done", "created", "tags"] + (["parent"] if depth else [])
+	components_code = [
+		"import ui_migrations\n",
+		"from .models import Item\n\n",
+		"FIELDS_OPTIONS = [\n",
+		*(
+			f"\tui_migrations.DataTable.FieldOptions(field_name='{field}', sortable={field in ('id', 'amount')}, modifiable_by_roles=['admin'], auto_generated={field in ('id', 'created')}),\n"
+			for field in fields
+		),
+		"]\n\n",
+	]
+	for index in range(component_count):
+		components_code.append(
+			f"class ItemTable{index}(ui_migrations.DataTable):\n"
+			"\tmodel = Item\n"
+			"\taddable_by_roles = ['admin']\n"
+			"\tremovable_by_roles = ['admin']\n"
+			"\tfields_options = FIELDS_OPTIONS\n"
+			"\tactions_options = [ui_migrations.ActionOptions(display_name='Next Status', roles=['admin'], actions=[ui_migrations.IterateAction(field_name='status')])]\n\n"
+		)
+	components_code.append(f"components = [{', '.join(f'ItemTable{index}(ui_framework=ui_migrations.UiFramework.VUE)' for index in range(component_count))}]\n")
+	components_code.append(f"frontends = {{ui_migrations.UiFramework.VUE: {os.path.join(project_dir, 'frontend')!r}}}\n")
+	with open(os.path.join(app_dir, "ui_components.py"), "w") as f:
+		f.write("".join(components_code))
+
+	with open(os.path.join(project_dir, "benchurls.py"), "w") as f:
+		f.write("from django.urls import path, include\n\nurlpatterns = [path('', include('ui_migrations.urls'))]\n")
+
+
+def setup_django(project_dir: str) -> None:
+	"""Configure and set up Django for the project in `project_dir`."""
+	import django
+	from django.conf import settings
+	sys.path.insert(0, project_dir)
+	settings.configure(
+		SECRET_KEY="benchmark",
+		DEBUG=False,
+		ALLOWED_HOSTS=["*"],
+		ROOT_URLCONF="benchurls",
+		INSTALLED_APPS=["django.contrib.auth", "django.contrib.contenttypes", "rest_framework", "ui_migrations", "benchapp"],
+		DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": os.path.join(project_dir, "db.sqlite3")}},
+		DEFAULT_AUTO_FIELD="django.db.models.BigAutoField",
+		USE_TZ=True,
+		TEMPLATES=[{
+			"BACKEND": "django.template.backends.jinja2.Jinja2",
+			"APP_DIRS": True,
+			"NAME": "jinja2",
+			"OPTIONS": {"variable_start_string": "{|", "variable_end_string": "|}"},
+		}],
+	)
+	django.setup()
+
+
+def populate(row_count: int, depth: int) -> None:
+	"""Create the tables and `row_count` items, each with a chain of related items and two tags."""
+	from django.core.management import call_command
+	from django.contrib.auth.models import User, Group
+	from benchapp import models # type: ignore
+	call_command("migrate", run_syncdb=True, verbosity=0)
+	admin = User.objects.create(username="admin")
+	admin.groups.add(Group.objects.create(name="admin"))
+
+	tags = models.Tag.objects.bulk_create([models.Tag(label=f"tag {index}") for index in range(10)])
+	parents = [None] * row_count
+	for level in range(depth, 0, -1):
+		level_model = getattr(models, f"Level{level}")
+		parents = level_model.objects.bulk_create([
+			level_model(name=f"level {level} {index}", **({"parent": parent} if level < depth else {}))
+			for index, parent in enumerate(parents)
+		])
+	items = models.Item.objects.bulk_create([
+		models.Item(title=f"item {index}", amount=index % 1000, status=("new", "open", "closed")[index % 3], **({"parent": parent} if depth else {}))
+		for index, parent in enumerate(parents)
+	])
+	models.Item.tags.through.objects.bulk_create([
+		models.Item.tags.through(item_id=item.pk, tag_id=tags[(item.pk + offset) % len(tags)].pk)
+		for item in items
+		for offset in range(2)
+	])
+
+
+def percentile(values: list[float], percent: float) -> float:
+	"""Get the `percent` percentile of the `values` (nearest rank)."""
+	values = sorted(values)
+	return values[max(0, min(len(values) - 1, round(percent / 100 * len(values) + 0.5) - 1))]
+
+
+def bench_endpoints(iterations: int, page_size: int, depth: int) -> dict:
+	"""Measure the latency and query counts of the REST endpoints with the test client (without network)."""
+	from django.contrib.auth.models import User
+	from django.db import connection
+	from django.test.utils import CaptureQueriesContext
+	from rest_framework.test import APIClient
+	from benchapp import models # type: ignore
+
+	client = APIClient()
+	client.force_authenticate(User.objects.get(username="admin"))
+	fields = "id,title,amount,status,done,created,tags" + (",parent" if depth else "")
+	pks = list(models.Item.objects.order_by("pk").values_list("pk", flat=True)[:iterations])
+	created_pks: list[int] = []
+
+	def run(method: str, get_url, get_data=lambda index: None, expected_status: int = 200) -> dict:
+		durations: list[float] = []
+		query_counts: list[int] = []
+		if method == "get":
+			# the first request loads the URLs and compiles the serializers, which is not measured
+			client.get(get_url(0))
+		for index in range(iterations):
+			url, data = get_url(index), get_data(index)
+			with CaptureQueriesContext(connection) as context:
+				start = time.perf_counter()
+				response = getattr(client, method)(url, data=data, format="json")
+				durations.append((time.perf_counter() - start) * 1000)
+			if response.status_code != expected_status:
+				raise RuntimeError(f"{method.upper()} {url} responded with {response.status_code}: {response.content[:200]!r}")
+			if method == "post":
+				created_pks.append(response.data["pk"])
+			query_counts.append(len(context.captured_queries))
+		return {
+			"p50_ms": round(percentile(durations, 50), 3),
+			"p99_ms": round(percentile(durations, 99), 3),
+			"mean_ms": round(statistics.mean(durations), 3),
+			"queries": max(query_counts),
+		}
+
+	return {
+		"list": run("get", lambda index: f"/items?_fields={fields}&_pageSize={page_size}&_page={index % 5 + 1}&_sortBy=amount"),
+		"item": run("get", lambda index: f"/items/{pks[index % len(pks)]}?_fields={fields}"),
+		"create": run("post", lambda index: "/items", lambda index: {"title": f"new {index}", "amount": index, "status": "new"}),
+		"patch": run("patch", lambda index: f"/items/{pks[index % len(pks)]}", lambda index: {"status": ("new", "open", "closed")[index % 3]}),
+		"delete": run("delete", lambda index: f"/items/{created_pks[index]}", expected_status=204),
+	}
+
+
+def bench_migrate_ui(project_dir: str) -> dict:
+	"""Time `migrate_ui` without any generated files (cold) and again without any changes (warm)."""
+	from django.core.management import call_command
+	components_dir = os.path.join(project_dir, "frontend", "src", "components")
+	shutil.rmtree(components_dir)
+	os.makedirs(components_dir)
+	for name in os.listdir(os.path.join(project_dir, "frontend")):
+		if name.startswith("."):
+			os.remove(os.path.join(project_dir, "frontend", name))
+	start = time.perf_counter()
+	call_command("migrate_ui", stdout=io.StringIO())
+	cold = time.perf_counter() - start
+	start = time.perf_counter()
+	call_command("migrate_ui", stdout=io.StringIO())
+	warm = time.perf_counter() - start
+	return {"cold_ms": round(cold * 1000, 3), "warm_ms": round(warm * 1000, 3), "components": len(os.listdir(components_dir))}
+
+
+def bench_safe_regions(megabytes: float) -> dict:
+	"""Time merging the safe regions of component files of about `megabytes` size."""
+	from ui_migrations.safe_regions import merge_safe_regions
+	results = {}
+	for region_count in (10, 1000):
+		size = int(megabytes * 1024 * 1024)
+		old_code = make_component(size, region_count, True, "\tconst custom = 1 /* some comment */\n" * 20)
+		new_code = make_component(size, region_count, True, "\n")
+		results[f"{region_count}_regions"] = {
+			"megabytes": round(len(old_code) / 1024 / 1024, 2),
+			"merge_ms": round(measure(merge_safe_regions, new_code, old_code) * 1000, 3),
+		}
+	return results
+
+
+def get_commit() -> str | None:
+	"""Get the hash of the checked out commit of the repository (or `None` if it is not available)."""
+	try:
+		return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPOSITORY_DIR, capture_output=True, text=True, check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Benchmark the REST endpoints and the code generator.")
+	parser.add_argument("--rows", type=int, default=10000, help="Number of items in the database.")
+	parser.add_argument("--depth", type=int, default=2, help="Number of models in the chain of related models below the items.")
+	parser.add_argument("--components", type=int, default=10, help="Number of components declared for the items.")
+	parser.add_argument("--iterations", type=int, default=200, help="Number of requests per endpoint.")
+	parser.add_argument("--page-size", type=int, default=100, help="Number of items per page of the list endpoint.")
+	parser.add_argument("--safe-regions-size", type=float, default=4, help="Size of the component files in megabytes for merging safe regions.")
+	parser.add_argument("--output", help="Path of the JSON file with the results (default: `benchmarks/results/<time>-<commit>.json`).")
+	args = parser.parse_args()
+
+	commit = get_commit()
+	with tempfile.TemporaryDirectory(prefix="ui_migrations_benchmark_") as project_dir:
+		write_project(project_dir, args.depth, args.components)
+		setup_django(project_dir)
+		populate(args.rows, args.depth)
+		import django
+		results = {
+			"commit": commit,
+			"time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+			"environment": {"python": platform.python_version(), "django": django.get_version(), "platform": platform.platform()},
+			"parameters": {name: value for name, value in vars(args).items() if name != "output"},
+			"endpoints": bench_endpoints(args.iterations, args.page_size, args.depth),
+			"migrate_ui": bench_migrate_ui(project_dir),
+			"safe_regions": bench_safe_regions(args.safe_regions_size),
+		}
+
+	output = args.output or os.path.join(
+		BENCHMARKS_DIR, "results", f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{(commit or 'unknown')[:8]}.json"
+	)
+	os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+	with open(output, "w") as f:
+		json.dump(results, f, indent="\t")
+		f.write("\n")
+	print(json.dumps(results, indent="\t"))
+	print(f"Wrote the results to '{output}'.")
+
+
+if __name__ == "__main__":
+	main()
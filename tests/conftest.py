@@ -0,0 +1,19 @@
+import os
+
+import django
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+django.setup()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def django_test_databases():
+	"""Create the test database once, like `manage.py test` does (the test cases are Django `TestCase`s)."""
+	from django.test.runner import DiscoverRunner
+	runner = DiscoverRunner(verbosity=0, interactive=False)
+	runner.setup_test_environment()
+	old_config = runner.setup_databases()
+	yield
+	runner.teardown_databases(old_config)
+	runner.teardown_test_environment()
@@ -0,0 +1,15 @@
+"""Settings of the Django project that the tests run against."""
+SECRET_KEY = "tests"
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+ROOT_URLCONF = "ui_migrations.urls"
+INSTALLED_APPS = ["django.contrib.auth", "django.contrib.contenttypes", "rest_framework", "ui_migrations", "tests.testapp"]
+DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+USE_TZ = True
+TEMPLATES = [{
+	"BACKEND": "django.template.backends.jinja2.Jinja2",
+	"APP_DIRS": True,
+	"NAME": "jinja2",
+	"OPTIONS": {"variable_start_string": "{|", "variable_end_string": "|}"},
+}]
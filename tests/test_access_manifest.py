@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from ui_migrations.access_manifest import get_access_manifest_path, get_models_access, load_access_manifest, write_access_manifest
+from .testapp.models import Order
+from .testapp.ui_components import components
+
+
+class AccessManifestTests(SimpleTestCase):
+	"""Writing the access manifest and loading it only while it is current."""
+
+	def setUp(self):
+		temporary_dir = tempfile.TemporaryDirectory()
+		self.addCleanup(temporary_dir.cleanup)
+		self.manifest_path = os.path.join(temporary_dir.name, "access.json")
+
+	def test_disabled_by_default(self):
+		self.assertIsNone(get_access_manifest_path())
+		self.assertIsNone(write_access_manifest(get_models_access(components)))
+		self.assertIsNone(load_access_manifest())
+
+	def test_round_trip(self):
+		with override_settings(UI_MIGRATIONS_ACCESS_MANIFEST=self.manifest_path):
+			self.assertEqual(write_access_manifest(get_models_access(components)), self.manifest_path)
+			self.assertEqual(load_access_manifest(), get_models_access(components))
+
+	def test_outdated_manifest_is_not_used(self):
+		with override_settings(UI_MIGRATIONS_ACCESS_MANIFEST=self.manifest_path):
+			with self.assertLogs("ui_migrations.access_manifest", "WARNING"):
+				self.assertIsNone(load_access_manifest())
+			write_access_manifest(get_models_access(components))
+			with open(self.manifest_path) as f:
+				manifest = json.load(f)
+			manifest["sources"]["testapp"] = "changed"
+			manifest["models"][Order._meta.label]["addable_by_roles"] = ["everyone"]
+			with open(self.manifest_path, "w") as f:
+				json.dump(manifest, f)
+			with self.assertLogs("ui_migrations.access_manifest", "WARNING"):
+				self.assertIsNone(load_access_manifest())
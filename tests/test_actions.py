@@ -0,0 +1,37 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .testapp.models import Order
+
+
+class ActionTests(TestCase):
+	"""Running the server-side part of an action on multiple items."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.admin = User.objects.create(username="admin")
+		cls.admin.groups.add(Group.objects.create(name="admin"))
+		cls.orders = [Order.objects.create(total_price=Decimal(index)) for index in range(3)]
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.admin)
+
+	def test_action(self):
+		response = self.client.post("/orders/actions/OrderTable/0", {"pks": [self.orders[0].pk, str(self.orders[1].pk)]}, format="json")
+		self.assertEqual(response.status_code, 200, response.data)
+		self.assertEqual(response.data, {"updated": 2})
+		self.assertEqual(list(Order.objects.order_by("pk").values_list("status", flat=True)), ["paid", "paid", "new"])
+
+	def test_invalid_input(self):
+		for data in ([1, 2], {"pks": 1}, {"pks": ["x"]}, {"pks": [{"a": 1}]}):
+			with self.subTest(data=data):
+				self.assertEqual(self.client.post("/orders/actions/OrderTable/0", data, format="json").status_code, 400)
+
+	def test_unknown_action_and_permissions(self):
+		self.assertEqual(self.client.post("/orders/actions/OrderTable/1", {"pks": []}, format="json").status_code, 404)
+		self.client.force_authenticate(User.objects.create(username="user"))
+		self.assertEqual(self.client.post("/orders/actions/OrderTable/0", {"pks": []}, format="json").status_code, 403)
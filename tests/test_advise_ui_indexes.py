@@ -0,0 +1,35 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from .testapp.models import Order
+
+
+class AdviseUiIndexesTests(TestCase):
+	"""The command lists the sortable and filterable fields of the test app that have no index."""
+
+	def advise(self) -> str:
+		stdout = io.StringIO()
+		call_command("advise_ui_indexes", stdout=stdout)
+		return stdout.getvalue()
+
+	def test_missing_indexes(self):
+		self.assertEqual(self.advise().splitlines(), [
+			"testapp.Order.status (filterable) has no index.",
+			"testapp.Order.total_price (sortable) has no index.",
+		])
+
+	def test_existing_indexes(self):
+		# the primary key and the foreign key are sortable as well, but have an index already
+		output = self.advise()
+		self.assertNotIn("Order.id", output)
+		self.assertNotIn("Order.customer", output)
+		# as have fields with an index that only exists in the database (which is rolled back after the test)
+		with connection.cursor() as cursor:
+			cursor.execute(f"CREATE INDEX testapp_order_status_idx ON {Order._meta.db_table} (status)")
+		self.assertEqual(self.advise().splitlines(), ["testapp.Order.total_price (sortable) has no index."])
+		with connection.cursor() as cursor:
+			cursor.execute(f"CREATE INDEX testapp_order_price_idx ON {Order._meta.db_table} (total_price, status)")
+		self.assertIn("All sortable and filterable fields have an index.", self.advise())
@@ -0,0 +1,201 @@
+import contextlib
+import importlib
+import json
+from decimal import Decimal
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import Group, User
+from django.test import TestCase, override_settings
+from django.urls import clear_url_caches, resolve
+from rest_framework.test import APIClient
+
+import ui_migrations.urls
+from .testapp.models import Customer, Order, Tag
+
+
+@contextlib.contextmanager
+def views_mode(async_views: bool):
+	"""Configure the URLs with the sync or the async item and list views (`UI_MIGRATIONS_ASYNC_VIEWS`) and restore them afterwards."""
+	try:
+		with override_settings(UI_MIGRATIONS_ASYNC_VIEWS=async_views):
+			importlib.reload(ui_migrations.urls)
+			clear_url_caches()
+			yield
+	finally:
+		importlib.reload(ui_migrations.urls)
+		clear_url_caches()
+
+
+class ViewsScenarios:
+	"""Scenarios of the item and list endpoints, which both the sync and the async views have to pass alike."""
+	async_views: bool
+
+	@classmethod
+	def setUpClass(cls):
+		cls.enterClassContext(views_mode(cls.async_views)) # type: ignore
+		super().setUpClass() # type: ignore
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.admin = User.objects.create(username="admin")
+		cls.admin.groups.add(Group.objects.create(name="admin"))
+		cls.user = User.objects.create(username="user")
+		tags = [Tag.objects.create(label="a"), Tag.objects.create(label="b")]
+		customer = Customer.objects.create(name="c")
+		cls.orders = []
+		for index in range(7):
+			order = Order.objects.create(total_price=Decimal(index), note=f"n{index}", customer=customer if index % 2 else None)
+			order.tags.set(tags)
+			cls.orders.append(order)
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.admin)
+		self.user_client = APIClient()
+		self.user_client.force_authenticate(self.user)
+
+	def test_mode(self):
+		self.assertEqual(iscoroutinefunction(resolve("/orders").func), self.async_views)
+		self.assertEqual(iscoroutinefunction(resolve("/orders/1").func), self.async_views)
+
+	def test_list_pages(self):
+		response = self.client.get("/orders?_fields=id,total_price,customer,tags&_pageSize=3&_page=2")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual([item["pk"] for item in response.data["items"]], [order.pk for order in self.orders[3:6]])
+		self.assertEqual((response.data["totalItems"], response.data["totalPages"], response.data["page"]), (7, 3, 2))
+		self.assertEqual(response.data["items"][0]["customer"]["name"], "c")
+		self.assertEqual(len(response.data["items"][0]["tags"]), 2)
+		# page numbers out of range show the last page
+		for page in (99, 0):
+			with self.subTest(page=page):
+				response = self.client.get(f"/orders?_fields=id&_pageSize=3&_page={page}")
+				self.assertEqual([item["pk"] for item in response.data["items"]], [self.orders[6].pk])
+				self.assertEqual(response.data["page"], page)
+		response = self.client.get("/orders?_fields=id,status&status=paid")
+		self.assertEqual((response.data["items"], response.data["totalItems"], response.data["totalPages"]), ([], 0, 1))
+
+	def test_list_cursors(self):
+		response = self.client.get("/orders?_fields=id,customer&_pagination=cursor&_pageSize=4&_sortBy=customer&_withTotal=true")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response.data["totalItems"], 7)
+		self.assertIsNone(response.data["prevCursor"])
+		first_page = [item["pk"] for item in response.data["items"]]
+		response = self.client.get(f"/orders?_fields=id,customer&_pagination=cursor&_pageSize=4&_sortBy=customer&_cursor={response.data['nextCursor']}")
+		self.assertIsNone(response.data["nextCursor"])
+		self.assertCountEqual(first_page + [item["pk"] for item in response.data["items"]], [order.pk for order in self.orders])
+		self.assertEqual(self.client.get("/orders?_fields=id&_pagination=cursor&_cursor=garbage").status_code, 400)
+
+	def test_item(self):
+		order = self.orders[1]
+		response = self.client.get(f"/orders/{order.pk}?_fields=id,total_price,note,customer,tags")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual((response.data["total_price"], response.data["note"], response.data["customer"]["name"]), ("1.00", "n1", "c"))
+		self.assertEqual(len(response.data["tags"]), 2)
+		response = self.client.get("/orders/999?_fields=id")
+		self.assertEqual((response.status_code, response.data), (200, {}))
+
+	def test_errors(self):
+		self.assertEqual(self.user_client.get("/orders?_fields=id,note").status_code, 403)
+		self.assertEqual(self.user_client.get(f"/orders/{self.orders[0].pk}?_fields=id,note").status_code, 403)
+		self.assertEqual(self.client.get("/orders?_fields=id&_sortBy=note").status_code, 400)
+		self.assertEqual(self.client.get("/orders?_fields=id&note=n1").status_code, 400)
+		for method, path in (("put", f"/orders/{self.orders[0].pk}"), ("post", f"/orders/{self.orders[0].pk}"), ("delete", "/orders")):
+			with self.subTest(method=method, path=path):
+				response = getattr(self.client, method)(path, {}, format="json")
+				self.assertEqual(response.status_code, 405)
+				self.assertEqual(response.data, {"detail": f'Method "{method.upper()}" not allowed.'})
+
+	def test_options(self):
+		response = self.client.options("/orders")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(set(response["Allow"].split(", ")), {"GET", "POST", "OPTIONS"})
+		self.assertEqual(response.data["description"], "Get all items or create a new item.")
+		self.assertIn("application/json", response.data["renders"])
+		response = self.client.options(f"/orders/{self.orders[0].pk}")
+		self.assertEqual(set(response["Allow"].split(", ")), {"GET", "PATCH", "DELETE", "OPTIONS"})
+
+	def test_patch(self):
+		order = self.orders[0]
+		response = self.client.patch(f"/orders/{order.pk}", {"status": "paid"}, format="json")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual((response.data["pk"], response.data["status"]), (order.pk, "paid"))
+		self.assertEqual(self.client.patch(f"/orders/{order.pk}", {"total_price": "abc"}, format="json").status_code, 400)
+		self.assertEqual(self.user_client.patch(f"/orders/{order.pk}", {"status": "new"}, format="json").status_code, 403)
+		order.refresh_from_db()
+		self.assertEqual(order.status, "paid")
+		# nested relations are read-only, whatever their items look like
+		response = self.client.patch(f"/orders/{order.pk}", {"tags": [{"pk": "a", "label": "x"}], "customer": {"pk": "c", "name": "x"}, "note": "n"}, format="json")
+		self.assertEqual(response.status_code, 200, response.data)
+		self.assertEqual(order.tags.count(), 2)
+		self.assertEqual(sorted(Tag.objects.values_list("label", flat=True)), ["a", "b"])
+		self.assertEqual(Customer.objects.get().name, "c")
+
+	def test_post(self):
+		response = self.client.post("/orders", {"total_price": "9.50"}, format="json")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual((response.data["total_price"], response.data["status"]), ("9.50", "new"))
+		self.assertEqual(self.client.post("/orders", {"total_price": "abc"}, format="json").status_code, 400)
+		self.assertEqual(self.user_client.post("/orders", {"total_price": "1.00"}, format="json").status_code, 403)
+		self.assertEqual(Order.objects.count(), 8)
+
+	def test_delete(self):
+		order = self.orders[0]
+		self.assertEqual(self.user_client.delete(f"/orders/{order.pk}").status_code, 403)
+		self.assertEqual(self.client.delete(f"/orders/{order.pk}").status_code, 204)
+		self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+
+	def test_not_modified(self):
+		etag = self.client.get("/orders?_fields=id,status")["ETag"]
+		self.assertEqual(self.client.get("/orders?_fields=id,status", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+		item_etag = self.client.get(f"/orders/{self.orders[0].pk}?_fields=id,status")["ETag"]
+		self.assertEqual(self.client.get(f"/orders/{self.orders[0].pk}?_fields=id,status", HTTP_IF_NONE_MATCH=item_etag).status_code, 304)
+		self.client.patch(f"/orders/{self.orders[0].pk}", {"status": "paid"}, format="json")
+		self.assertEqual(self.client.get("/orders?_fields=id,status", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+		self.assertEqual(self.client.get(f"/orders/{self.orders[0].pk}?_fields=id,status", HTTP_IF_NONE_MATCH=item_etag).status_code, 200)
+
+
+class SyncViewsTests(ViewsScenarios, TestCase):
+	async_views = False
+
+
+class AsyncViewsTests(ViewsScenarios, TestCase):
+	async_views = True
+
+
+class ViewsParityTests(TestCase):
+	"""The sync and the async views respond identically to the same requests."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create(username="user")
+		customer = Customer.objects.create(name="c")
+		for index in range(5):
+			Order.objects.create(total_price=Decimal(index), customer=customer if index % 2 else None)
+
+	def responses(self, async_views: bool) -> list:
+		client = APIClient()
+		client.force_authenticate(self.user)
+		pk = Order.objects.first().pk
+		with views_mode(async_views):
+			return [
+				(response.status_code, response.get("ETag"), response.get("Content-Type"), json.loads(response.content) if response.content else None)
+				for response in (
+					client.get(path, **headers)
+					for path, headers in (
+						("/orders?_fields=id,total_price,customer&_pageSize=2&_page=2", {}),
+						("/orders?_fields=id&_pageSize=2&_page=99", {}),
+						("/orders?_fields=id,customer&_pagination=cursor&_pageSize=2&_sortBy=customer", {}),
+						("/orders?_fields=id&_pagination=cursor&_cursor=garbage", {}),
+						(f"/orders/{pk}?_fields=id,total_price,customer", {}),
+						("/orders/999?_fields=id", {}),
+						("/orders?_fields=id,note", {}),
+						("/orders?_fields=id&_sortBy=note", {}),
+						(f"/orders/{pk}?_fields=id&format=json", {}),
+						("/orders?_fields=id,status&status=paid", {}),
+					)
+				)
+			]
+
+	def test_same_responses(self):
+		sync_responses = self.responses(False)
+		self.assertEqual(self.responses(True), sync_responses)
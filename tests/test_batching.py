@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .testapp.models import Order
+
+
+class BatchTests(TestCase):
+	"""Running several queries of the endpoints in one request."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create(username="user")
+		cls.order = Order.objects.create(total_price=Decimal(1))
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_results_in_order(self):
+		response = self.client.post("/ui-migrations/batch", {"queries": [
+			{"model": "order", "params": {"_fields": "id,status"}},
+			{"model": "order", "pk": self.order.pk, "params": {"_fields": "id"}},
+			{"model": "order", "pk": "999", "params": {"_fields": "id"}},
+			{"model": "order", "params": {"_fields": "note"}},
+			{"model": "customer"},
+		]}, format="json")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual([result["status"] for result in response.data["results"]], [200, 200, 200, 403, 404])
+		self.assertEqual(response.data["results"][0]["data"]["items"], [{"id": self.order.pk, "status": "new", "pk": self.order.pk}])
+		self.assertEqual(response.data["results"][1]["data"], {"id": self.order.pk, "pk": self.order.pk})
+
+	def test_malformed_query_only_fails_itself(self):
+		response = self.client.post("/ui-migrations/batch", {"queries": [
+			{"model": "order", "pk": "undefined"},
+			{"model": "order", "pk": self.order.pk, "params": {"_fields": "id"}},
+			{"model": "../admin"},
+			"order",
+			{"model": "order", "params": ["_fields"]},
+		]}, format="json")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual([result["status"] for result in response.data["results"]], [400, 200, 400, 400, 400])
+
+	@override_settings(UI_MIGRATIONS_BATCH_MAX_QUERIES=2)
+	def test_invalid_batch(self):
+		for data in ([1], {"queries": {}}, {"queries": [{"model": "order"}] * 3}):
+			with self.subTest(data=data):
+				self.assertEqual(self.client.post("/ui-migrations/batch", data, format="json").status_code, 400)
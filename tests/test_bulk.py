@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Group, User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .testapp.models import Order, Tag
+
+
+class BulkTests(TestCase):
+	"""Creating, updating and deleting multiple items with the bulk endpoint."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.admin = User.objects.create(username="admin")
+		cls.admin.groups.add(Group.objects.create(name="admin"))
+		cls.tag = Tag.objects.create(label="a")
+		cls.orders = [Order.objects.create(total_price=Decimal(index), note=f"n{index}") for index in range(3)]
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.admin)
+
+	def test_create_update_delete(self):
+		first, second, third = self.orders
+		response = self.client.post("/orders/bulk", {
+			"create": [{"total_price": "9.00"}],
+			"update": [{"pk": first.pk, "status": "paid"}, {"pk": str(second.pk), "done": True}],
+			"delete": [third.pk],
+		}, format="json")
+		self.assertEqual(response.status_code, 200, response.data)
+		self.assertEqual(len(response.data["created"]), 1)
+		self.assertEqual([item["pk"] for item in response.data["updated"]], [first.pk, second.pk])
+		self.assertEqual(response.data["deleted"], 1)
+		first.refresh_from_db()
+		second.refresh_from_db()
+		self.assertEqual((first.status, first.done), ("paid", False))
+		self.assertEqual((second.status, second.done), ("new", True))
+		self.assertFalse(Order.objects.filter(pk=third.pk).exists())
+
+	def test_only_updated_columns_are_written(self):
+		first, second, _ = self.orders
+		with CaptureQueriesContext(connection) as context:
+			response = self.client.post("/orders/bulk", {"update": [{"pk": first.pk, "status": "paid"}, {"pk": second.pk, "note": "changed"}]}, format="json")
+		self.assertEqual(response.status_code, 200, response.data)
+		updates = [query["sql"] for query in context.captured_queries if query["sql"].startswith("UPDATE")]
+		self.assertEqual(len(updates), 2)
+		self.assertNotIn('"note"', updates[0])
+		self.assertNotIn('"status"', updates[1])
+
+	def test_fields_that_are_not_columns_are_ignored(self):
+		first = self.orders[0]
+		response = self.client.post("/orders/bulk", {"update": [{"pk": first.pk, "tags": [self.tag.pk]}]}, format="json")
+		self.assertEqual(response.status_code, 200, response.data)
+		self.assertEqual(first.tags.count(), 0)
+
+	def test_invalid_input(self):
+		for data in (
+			[1, 2],
+			{"update": {"pk": 1}},
+			{"update": [{"status": "paid"}]},
+			{"update": [{"pk": "x", "status": "paid"}]},
+			{"update": [{"pk": {"a": 1}, "status": "paid"}]},
+			{"delete": ["x"]},
+			{"create": [{"total_price": "abc"}]},
+			{"update": [{"pk": self.orders[0].pk, "total_price": "abc"}]},
+			{"update": [{"pk": 999, "status": "paid"}]},
+		):
+			with self.subTest(data=data):
+				response = self.client.post("/orders/bulk", data, format="json")
+				self.assertEqual(response.status_code, 400, response.data)
+		self.assertEqual(Order.objects.count(), 3)
+
+	def test_permissions(self):
+		self.client.force_authenticate(User.objects.create(username="user"))
+		for data in ({"create": [{"total_price": "1.00"}]}, {"delete": [self.orders[0].pk]}, {"update": [{"pk": self.orders[0].pk, "status": "paid"}]}):
+			with self.subTest(data=data):
+				self.assertEqual(self.client.post("/orders/bulk", data, format="json").status_code, 403)
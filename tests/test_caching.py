@@ -0,0 +1,113 @@
+import hashlib
+from decimal import Decimal
+import contextlib
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils.http import quote_etag
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from ui_migrations.renderers import ORJSONRenderer
+from ui_migrations.caching import connect_invalidation_signals, warn_if_process_local
+from .testapp.models import Order
+
+
+@contextlib.contextmanager
+def count_renders():
+	"""Count how often responses are rendered as JSON (by either JSON renderer) in `.count`."""
+	counter = mock.Mock(count=0)
+	def patch(renderer_class):
+		render = renderer_class.render
+		def counting_render(self, *args, **kwargs):
+			counter.count += 1
+			return render(self, *args, **kwargs)
+		return mock.patch.object(renderer_class, "render", counting_render)
+	with patch(JSONRenderer), patch(ORJSONRenderer):
+		yield counter
+
+
+@override_settings(
+	CACHES={
+		"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+		"responses": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "responses"},
+	},
+	UI_MIGRATIONS_RESPONSE_CACHE="responses",
+)
+class ResponseCacheTests(TestCase):
+	"""Conditional GET and the response cache with write-driven invalidation."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create(username="user")
+		cls.order = Order.objects.create(total_price=Decimal(1))
+		# the URLs were configured without the response cache (invalidating without it does nothing)
+		connect_invalidation_signals(Order)
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+		warn_if_process_local.cache_clear()
+
+	def test_not_modified_and_invalidation(self):
+		with self.assertLogs("ui_migrations.caching", "WARNING"):
+			response = self.client.get("/orders?_fields=id,status")
+		etag = response["ETag"]
+		self.assertTrue(response.has_header("Last-Modified"))
+		# the cached response is served without queries
+		with self.assertNumQueries(0):
+			self.assertEqual(self.client.get("/orders?_fields=id,status", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+		Order.objects.filter(pk=self.order.pk).update(status="paid")
+		# updates don't send signals, so the response is still cached
+		self.assertEqual(self.client.get("/orders?_fields=id,status", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+		self.order.status = "shipped"
+		self.order.save()
+		response = self.client.get("/orders?_fields=id,status", HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response.data["items"][0]["status"], "shipped")
+
+	def test_cached_content_is_not_rendered_again(self):
+		with count_renders() as render:
+			first = self.client.get("/orders?_fields=id,status")
+			second = self.client.get("/orders?_fields=id,status")
+		self.assertEqual(render.count, 1)
+		self.assertEqual(second.content, first.content)
+		self.assertEqual((second["ETag"], second["Content-Type"]), (etag_of(first), "application/json"))
+		# other media types are cached separately
+		response = self.client.get("/orders?_fields=id,status&format=json", HTTP_ACCEPT="application/json; indent=4")
+		self.assertIn(b"\n    ", response.content)
+		self.assertEqual(response["ETag"], etag_of(response))
+		self.assertNotEqual(response["ETag"], first["ETag"])
+
+
+def etag_of(response) -> str:
+	"""The ETag of the content of the `response`."""
+	return quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest())
+
+
+class ETagTests(TestCase):
+	"""Without the response cache, the ETag is created from the content that is sent, which is only rendered once."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create(username="user")
+		cls.order = Order.objects.create(total_price=Decimal(1))
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_etag_of_the_content(self):
+		for path in ("/orders?_fields=id,status", f"/orders/{self.order.pk}?_fields=id,total_price", "/orders?_fields=id&format=json"):
+			with self.subTest(path=path), count_renders() as render:
+				response = self.client.get(path)
+				self.assertEqual(response.status_code, 200)
+				self.assertEqual(render.count, 1)
+				self.assertEqual(response["ETag"], etag_of(response))
+				self.assertEqual(response["Content-Type"], "application/json")
+
+	def test_errors_have_no_etag(self):
+		response = self.client.get("/orders?_fields=id&_sortBy=note")
+		self.assertEqual(response.status_code, 400)
+		self.assertFalse(response.has_header("ETag"))
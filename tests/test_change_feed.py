@@ -0,0 +1,64 @@
+import base64
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from ui_migrations.change_feed import create_change_feed_view
+from .testapp.models import Order
+
+
+class ChangeFeedTests(TestCase):
+	"""The change feed applies the access policy of the project like the other endpoints."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create_user(username="user", password="secret")
+
+	def setUp(self):
+		self.view = async_to_sync(create_change_feed_view(Order, lambda request: frozenset({"id", "status"})))
+		# the default permission classes are bound to the views when Django REST framework is imported
+		patcher = mock.patch.object(APIView, "permission_classes", [IsAuthenticated])
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def get(self, **headers):
+		return self.view(RequestFactory().get("/orders/changes", headers=headers))
+
+	def test_anonymous_user_is_rejected(self):
+		response = self.get(accept="text/event-stream")
+		self.assertEqual(response.status_code, 403)
+		self.assertEqual(response["Content-Type"], "application/json")
+
+	def test_invalid_credentials_are_rejected(self):
+		# without a `WWW-Authenticate` header of the first authentication (the session), Django REST framework answers with 403
+		response = self.get(authorization="Basic " + base64.b64encode(b"user:wrong").decode())
+		self.assertEqual(response.status_code, 403)
+		with mock.patch.object(APIView, "authentication_classes", [BasicAuthentication]):
+			self.view = async_to_sync(create_change_feed_view(Order, lambda request: frozenset({"id", "status"})))
+			response = self.get(authorization="Basic " + base64.b64encode(b"user:wrong").decode())
+		self.assertEqual(response.status_code, 401)
+		self.assertTrue(response.has_header("WWW-Authenticate"))
+
+	def test_method_not_allowed(self):
+		request = RequestFactory().post("/orders/changes")
+		request.user = self.user
+		request._dont_enforce_csrf_checks = True
+		self.assertEqual(self.view(request).status_code, 405)
+
+	def test_stream(self):
+		response = self.get(authorization="Basic " + base64.b64encode(b"user:secret").decode(), accept="text/event-stream")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response["Content-Type"], "text/event-stream")
+
+		async def first_chunk():
+			stream = aiter(response.streaming_content)
+			try:
+				return await anext(stream)
+			finally:
+				await stream.aclose()
+		self.assertEqual(async_to_sync(first_chunk)(), b": connected\n\n")
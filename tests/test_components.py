@@ -0,0 +1,43 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+import ui_migrations
+from .testapp.models import Order
+
+
+class ComponentSpecTests(SimpleTestCase):
+	"""The metadata of a component class is compiled and validated when the class is declared."""
+
+	def test_spec(self):
+		class Table(ui_migrations.DataTable):
+			model = Order
+			fields_options = [
+				ui_migrations.DataTable.FieldOptions(field_name="status", sortable=True, filterable=True, filter_lookups=["exact", "in"]),
+				ui_migrations.DataTable.FieldOptions(field_name="customer_id", sortable=True, filterable=True),
+				ui_migrations.DataTable.FieldOptions(field_name="total_price"),
+			]
+		spec = Table.spec
+		assert spec is not None
+		self.assertEqual(spec.field_names, ("status", "customer_id", "total_price"))
+		self.assertEqual(dict(spec.fields_choices), {"status": ("new", "paid", "shipped")})
+		# fields named by their attribute name are keyed by it
+		self.assertEqual(dict(spec.fields_input_types), {"status": "select", "customer_id": "text", "total_price": "number"})
+		self.assertEqual(spec.sortable_fields, {"status", "customer_id"})
+		self.assertEqual(dict(spec.filterable_lookups), {"status": {"exact", "in"}, "customer_id": {"exact"}})
+		self.assertIn("item['customer_id']", Table(ui_framework=ui_migrations.UiFramework.VUE).generate())
+
+	def test_validation_errors(self):
+		def declare_table(*fields_options):
+			type("Declared", (ui_migrations.DataTable,), {"model": Order, "fields_options": list(fields_options)})
+		def declare_entry(*fields_options):
+			type("Entry", (ui_migrations.DataEntry,), {"model": Order, "fields_options": list(fields_options)})
+		for declare, message in (
+			(lambda: declare_table(ui_migrations.DataTable.FieldOptions(field_name="missing")), "Component 'Declared': Model 'Order' has no field 'missing'."),
+			(lambda: declare_entry(ui_migrations.DataEntry.FieldOptions(field_name="status", fields_options=[ui_migrations.DataEntry.FieldOptions(field_name="name")])), "Component 'Entry': Field 'status' has nested fields, but is no relation."),
+			(lambda: declare_entry(ui_migrations.DataEntry.FieldOptions(field_name="customer", fields_options=[ui_migrations.DataEntry.FieldOptions(field_name="missing")])), "Component 'Entry': Model 'Customer' has no field 'missing'."),
+			(lambda: declare_table(ui_migrations.DataTable.FieldOptions(field_name="note", filterable=True, filter_lookups=["exact", "unknown"])), "Component 'Declared': Field 'note' doesn't support the lookup 'unknown'."),
+			(lambda: declare_table(ui_migrations.DataTable.FieldOptions(field_name="tags", sortable=True)), "Component 'Declared': Field 'tags' can't be sorted by, since it has no column."),
+			(lambda: declare_table(ui_migrations.DataTable.FieldOptions(field_name="note", modifiable_by_roles="admin")), "Component 'Declared': 'note.modifiable_by_roles' must be a list of role names."),
+		):
+			with self.subTest(message=message), self.assertRaisesMessage(ImproperlyConfigured, message):
+				declare()
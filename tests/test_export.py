@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import Group, User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .testapp.models import Customer, Order, Tag
+
+
+@override_settings(UI_MIGRATIONS_EXPORT_CHUNK_SIZE=2)
+class ExportTests(TestCase):
+	"""Streaming all items as NDJSON or CSV, checked like the list of items."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.admin = User.objects.create(username="admin")
+		cls.admin.groups.add(Group.objects.create(name="admin"))
+		cls.user = User.objects.create(username="user")
+		tag = Tag.objects.create(label="a")
+		customer = Customer.objects.create(name="c, d")
+		cls.orders = []
+		for index in range(5):
+			order = Order.objects.create(total_price=Decimal(index), note=f"n{index}", customer=customer if index % 2 else None)
+			order.tags.set([tag])
+			cls.orders.append(order)
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def export(self, query: str):
+		response = self.client.get(f"/orders/export?{query}")
+		self.assertEqual(response.status_code, 200)
+		return response, b"".join(response.streaming_content).decode()
+
+	def test_ndjson(self):
+		response, content = self.export("_fields=id,total_price,customer,tags&_sortBy=total_price&_sortDir=desc")
+		self.assertEqual(response["Content-Type"], "application/x-ndjson")
+		self.assertEqual(response["Content-Disposition"], 'attachment; filename="orders.ndjson"')
+		items = [json.loads(line) for line in content.splitlines()]
+		self.assertEqual([item["pk"] for item in items], [order.pk for order in reversed(self.orders)])
+		self.assertEqual(items[1], {"id": self.orders[3].pk, "total_price": "3.00", "customer": {"id": self.orders[3].customer_id, "name": "c, d"}, "tags": [{"id": self.orders[3].tags.get().pk, "label": "a"}], "pk": self.orders[3].pk})
+
+	def test_csv(self):
+		response, content = self.export("_format=csv&_fields=id,status,customer&status=new")
+		self.assertEqual(response["Content-Type"], "text/csv")
+		rows = list(csv.reader(io.StringIO(content)))
+		self.assertEqual(rows[0], ["id", "status", "customer", "pk"])
+		self.assertEqual([row[3] for row in rows[1:]], [str(order.pk) for order in self.orders])
+		self.assertEqual(rows[1][2], "")
+		self.assertEqual(json.loads(rows[2][2])["name"], "c, d")
+
+	def test_hidden_fields(self):
+		# the note is only visible for admins, and fields that are not requested are not exported
+		self.assertEqual(self.client.get("/orders/export?_fields=id,note").status_code, 403)
+		_, content = self.export("_fields=id")
+		self.assertEqual(json.loads(content.splitlines()[0]), {"id": self.orders[0].pk, "pk": self.orders[0].pk})
+		self.client.force_authenticate(self.admin)
+		_, content = self.export("_fields=id,note")
+		self.assertEqual(json.loads(content.splitlines()[0])["note"], "n0")
+
+	def test_whitelists(self):
+		for query in ("_fields=id&_sortBy=note", "_fields=id&note=n1", "_fields=id&total_price__gt=1", "_fields=id&_format=xml"):
+			with self.subTest(query=query):
+				self.assertEqual(self.client.get(f"/orders/export?{query}").status_code, 400)
+		# the parameters of the list are accepted as well, but don't paginate the export
+		_, content = self.export("_fields=id&_page=2&_pageSize=2&_sortBy=customer&format=json")
+		self.assertEqual(len(content.splitlines()), 5)
@@ -0,0 +1,118 @@
+import asyncio
+import contextlib
+import importlib
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.http import HttpRequest, HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import clear_url_caches
+from rest_framework.test import APIClient
+
+import ui_migrations.urls
+from ui_migrations.instrumentation import EndpointMetrics, Histogram, MetricsRegistry, instrument, metrics_registry
+from .testapp.models import Order
+
+
+recorded_metrics: list[EndpointMetrics] = []
+"""Measurements passed to the instrumentation hook"""
+
+
+@contextlib.contextmanager
+def instrumentation():
+	"""Configure the URLs with instrumented endpoints and the metrics endpoint, and restore them afterwards."""
+	try:
+		with override_settings(UI_MIGRATIONS_INSTRUMENTATION=True, UI_MIGRATIONS_INSTRUMENTATION_HOOK=recorded_metrics.append):
+			importlib.reload(ui_migrations.urls)
+			clear_url_caches()
+			yield
+	finally:
+		importlib.reload(ui_migrations.urls)
+		clear_url_caches()
+
+
+class HistogramTests(SimpleTestCase):
+	"""The histograms count the measurements per bucket and render them cumulatively."""
+
+	def test_buckets(self):
+		histogram = Histogram((1, 10))
+		for value in (0, 1, 5, 10, 11, 100):
+			histogram.observe(value)
+		self.assertEqual((histogram.counts, histogram.sum), ([2, 2, 2], 127))
+
+	def test_render(self):
+		registry = MetricsRegistry()
+		metrics = EndpointMetrics(model="testapp.Order", method="GET", endpoint="items", fields="id", status_code=200, duration=0.02, query_count=2, query_duration=0.001, rows=10, response_size=500)
+		registry.record(metrics)
+		registry.record(EndpointMetrics(**{**metrics.__dict__, "query_count": 4, "rows": 0}))
+		lines = registry.render().splitlines()
+		labels = 'model="testapp.Order",method="GET",endpoint="items"'
+		self.assertIn("# TYPE ui_migrations_request_queries histogram", lines)
+		self.assertIn(f'ui_migrations_request_queries_bucket{{{labels},le="2"}} 1', lines)
+		self.assertIn(f'ui_migrations_request_queries_bucket{{{labels},le="3"}} 1', lines)
+		self.assertIn(f'ui_migrations_request_queries_bucket{{{labels},le="5"}} 2', lines)
+		self.assertIn(f'ui_migrations_request_queries_bucket{{{labels},le="+Inf"}} 2', lines)
+		self.assertIn(f"ui_migrations_request_queries_sum{{{labels}}} 6.0", lines)
+		self.assertIn(f"ui_migrations_request_queries_count{{{labels}}} 2", lines)
+		self.assertIn(f'ui_migrations_response_rows_bucket{{{labels},le="0"}} 1', lines)
+		self.assertIn(f'ui_migrations_response_rows_bucket{{{labels},le="10"}} 2', lines)
+		registry.clear()
+		self.assertNotIn("ui_migrations_request_queries_count", registry.render())
+
+
+class InstrumentationTests(TestCase):
+	"""The instrumented endpoints record their measurements, which the metrics endpoint exposes."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create(username="user")
+		for index in range(3):
+			Order.objects.create(total_price=Decimal(index))
+
+	def setUp(self):
+		metrics_registry.clear()
+		recorded_metrics.clear()
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_metrics_endpoint(self):
+		with instrumentation():
+			self.assertEqual(self.client.get("/orders?_fields=id,status").status_code, 200)
+			response = self.client.get("/ui-migrations/metrics")
+		self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+		lines = response.content.decode().splitlines()
+		labels = 'model="testapp.Order",method="GET",endpoint="items"'
+		# counting and the page
+		self.assertIn(f"ui_migrations_request_queries_sum{{{labels}}} 2.0", lines)
+		self.assertIn(f"ui_migrations_response_rows_sum{{{labels}}} 3.0", lines)
+		self.assertIn(f"ui_migrations_request_duration_seconds_count{{{labels}}} 1", lines)
+		[metrics] = recorded_metrics
+		self.assertEqual((metrics.fields, metrics.status_code, metrics.query_count, metrics.rows), ("id,status", 200, 2, 3))
+		self.assertEqual(metrics.response_size, len(self.client.get("/orders?_fields=id,status").content))
+
+	def test_disabled(self):
+		self.assertEqual(self.client.get("/ui-migrations/metrics").status_code, 404)
+		def view(request):
+			return HttpResponse()
+		self.assertIs(instrument(view, Order, "items"), view)
+
+	def test_overlapping_async_requests(self):
+		async def view(request: HttpRequest) -> HttpResponse:
+			# the requests take turns, so that their queries interleave
+			for _ in range(int(request.GET["queries"])):
+				await sync_to_async(Order.objects.count)()
+				await asyncio.sleep(0.01)
+			return HttpResponse()
+		with override_settings(UI_MIGRATIONS_INSTRUMENTATION=True, UI_MIGRATIONS_INSTRUMENTATION_HOOK=recorded_metrics.append):
+			instrumented_view = instrument(view, Order, "items")
+		def request(queries: int) -> HttpRequest:
+			request = HttpRequest()
+			request.method = "GET"
+			request.GET["_fields"] = str(queries)
+			request.GET["queries"] = str(queries)
+			return request
+		async def handle_requests() -> None:
+			await asyncio.gather(instrumented_view(request(3)), instrumented_view(request(1)))
+		async_to_sync(handle_requests)()
+		self.assertEqual(sorted((metrics.fields, metrics.query_count) for metrics in recorded_metrics), [("1", 1), ("3", 3)])
@@ -0,0 +1,151 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command, CommandError
+from django.test import SimpleTestCase, override_settings
+
+import ui_migrations
+from ui_migrations.management.commands.migrate_ui import MANIFEST_FILE_NAME
+from .testapp import ui_components
+
+
+class MigrateUiTests(SimpleTestCase):
+	"""Migrating the components of the test app to a temporary frontend."""
+
+	def setUp(self):
+		temporary_directory = tempfile.TemporaryDirectory()
+		self.addCleanup(temporary_directory.cleanup)
+		self.path = temporary_directory.name
+		self.enterContext(mock.patch.object(ui_components, "frontends", {ui_migrations.UiFramework.VUE: self.path}))
+		self.table_path = os.path.join(self.path, "src", "components", "OrderTable.vue")
+
+	def migrate(self, *args) -> tuple[str, str]:
+		"""Run `migrate_ui` with the `args` and return its output and errors."""
+		stdout, stderr = io.StringIO(), io.StringIO()
+		call_command("migrate_ui", *args, stdout=stdout, stderr=stderr)
+		return stdout.getvalue(), stderr.getvalue()
+
+	def read(self, file_path: str) -> str:
+		with open(file_path) as f:
+			return f.read()
+
+	def write(self, file_path: str, content: str) -> None:
+		with open(file_path, "w") as f:
+			f.write(content)
+
+	def test_generate_and_skip(self):
+		stdout, _ = self.migrate()
+		self.assertIn(f"Generated '{self.table_path}'.", stdout)
+		self.assertIn("3 generated, 0 skipped, 0 unchanged.", stdout)
+		manifest = json.loads(self.read(os.path.join(self.path, MANIFEST_FILE_NAME)))
+		self.assertEqual(set(manifest), {"OrderTable", "orderStore", "batchLoader"})
+		# nothing changed, so the components are skipped without rendering them
+		with mock.patch.object(ui_components.OrderTable, "generate") as generate:
+			stdout, _ = self.migrate()
+		generate.assert_not_called()
+		self.assertIn("0 generated, 3 skipped, 0 unchanged.", stdout)
+		stdout, _ = self.migrate("--force")
+		self.assertIn("0 generated, 0 skipped, 3 unchanged.", stdout)
+
+	def test_edited_file(self):
+		self.migrate()
+		code = self.read(self.table_path)
+		# code in safe regions is kept, while other edits are overwritten
+		edited_code = code.replace("<!-- SAFE REGION BEGIN header -->\n", "<!-- SAFE REGION BEGIN header -->\n<th>custom</th>\n").replace("</template>", "</template>edited", 1)
+		self.write(self.table_path, edited_code)
+		stdout, _ = self.migrate()
+		self.assertIn("1 generated, 2 skipped, 0 unchanged.", stdout)
+		self.assertEqual(self.read(self.table_path), edited_code.replace("</template>edited", "</template>", 1))
+		self.assertIn("0 generated, 3 skipped, 0 unchanged.", self.migrate()[0])
+
+	def test_removed_safe_region(self):
+		self.migrate()
+		code = self.read(self.table_path)
+		edited_code = code.replace("</template>", "<!-- SAFE REGION BEGIN removed -->\n<p>custom</p>\n<!-- SAFE REGION END -->\n</template>", 1)
+		self.write(self.table_path, edited_code)
+		_, stderr = self.migrate()
+		# the content of the safe region is not in the template anymore, so it is kept in a backup
+		self.assertIn(f"Removed the safe regions 'removed' with custom code from '{self.table_path}', the previous file is kept in '{self.table_path}.bak'.", stderr)
+		self.assertEqual(self.read(self.table_path), code)
+		self.assertEqual(self.read(f"{self.table_path}.bak"), edited_code)
+
+	def test_changed_template(self):
+		self.migrate()
+		templates_directory = tempfile.TemporaryDirectory()
+		self.addCleanup(templates_directory.cleanup)
+		os.makedirs(os.path.join(templates_directory.name, "vue"))
+		template = self.read(os.path.join(os.path.dirname(ui_migrations.__file__), "jinja2", "vue", "DataTable.html.j2"))
+		self.write(os.path.join(templates_directory.name, "vue", "DataTable.html.j2"), template + "<!-- changed -->\n")
+		with override_settings(TEMPLATES=[{**settings.TEMPLATES[0], "DIRS": [templates_directory.name]}]):
+			stdout, _ = self.migrate()
+		self.assertIn("1 generated, 2 skipped, 0 unchanged.", stdout)
+		self.assertIn("<!-- changed -->", self.read(self.table_path))
+
+	def test_changed_context(self):
+		self.migrate()
+		with mock.patch.object(ui_components.OrderTable, "removable_by_roles", []):
+			stdout, _ = self.migrate()
+		self.assertIn(f"Generated '{self.table_path}'.", stdout)
+		self.assertIn("1 generated, 2 skipped, 0 unchanged.", stdout)
+
+	def test_errors(self):
+		os.makedirs(os.path.dirname(self.table_path))
+		self.write(self.table_path, "<!-- SAFE REGION BEGIN header -->\n")
+		with self.assertRaisesMessage(CommandError, f"Failed to migrate '{self.table_path}'."):
+			self.migrate()
+		# the other components are migrated and the failed one is reported before the command fails
+		self.assertTrue(os.path.exists(os.path.join(self.path, "src", "stores", "orderStore.ts")))
+		self.assertEqual(self.read(self.table_path), "<!-- SAFE REGION BEGIN header -->\n")
+		manifest = json.loads(self.read(os.path.join(self.path, MANIFEST_FILE_NAME)))
+		self.assertEqual(set(manifest), {"orderStore", "batchLoader"})
+		stdout, stderr = io.StringIO(), io.StringIO()
+		with self.assertRaises(CommandError):
+			call_command("migrate_ui", stdout=stdout, stderr=stderr)
+		self.assertIn(f"Failed to migrate '{self.table_path}': Failed to merge safe regions in 'OrderTable.vue': Safe region 'header' does not end.", stderr.getvalue())
+		self.assertIn("0 generated, 2 skipped, 0 unchanged.", stdout.getvalue())
+
+	def test_jobs(self):
+		stdout, _ = self.migrate("--jobs", "1")
+		files = self.read_files()
+		for name in files:
+			os.remove(os.path.join(self.path, name))
+		# the workers generate the same files and manifest, reported in the same order
+		parallel_stdout, _ = self.migrate("--jobs", "2")
+		self.assertEqual(self.read_files(), files)
+		self.assertEqual(parallel_stdout, stdout)
+
+	def test_jobs_errors(self):
+		os.makedirs(os.path.dirname(self.table_path))
+		self.write(self.table_path, "<!-- SAFE REGION BEGIN header -->\n")
+		stdout, stderr = io.StringIO(), io.StringIO()
+		with self.assertRaisesMessage(CommandError, f"Failed to migrate '{self.table_path}'."):
+			call_command("migrate_ui", "--jobs", "2", stdout=stdout, stderr=stderr)
+		self.assertIn(f"Failed to migrate '{self.table_path}': Failed to merge safe regions in 'OrderTable.vue': Safe region 'header' does not end.", stderr.getvalue())
+		self.assertIn("2 generated, 0 skipped, 0 unchanged.", stdout.getvalue())
+
+	def read_files(self) -> dict[str, str]:
+		"""Read all files of the frontend by their relative paths."""
+		return {
+			os.path.relpath(os.path.join(directory, name), self.path): self.read(os.path.join(directory, name))
+			for directory, _, names in os.walk(self.path)
+			for name in names
+		}
+
+	def test_watch_access_manifest(self):
+		manifest_path = os.path.join(self.path, "access.json")
+		template_path = os.path.realpath(os.path.join(os.path.dirname(ui_migrations.__file__), "jinja2", "vue", "DataTable.html.j2"))
+		watcher = mock.Mock()
+		# the template changes once, then the command is stopped
+		watcher.wait.side_effect = [{template_path}, KeyboardInterrupt]
+		with override_settings(UI_MIGRATIONS_ACCESS_MANIFEST=manifest_path), mock.patch("ui_migrations.management.commands.migrate_ui.get_file_watcher", return_value=watcher):
+			self.migrate()
+			manifest = self.read(manifest_path)
+			stdout, _ = self.migrate("--watch")
+		self.assertIn("Migrated 1 components", stdout)
+		# the access of the stores is not written to the manifest
+		self.assertEqual(self.read(manifest_path), manifest)
+		self.assertNotIn("orderStore", manifest)
@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .testapp.models import Customer, Order
+
+
+class CursorPaginationTests(TestCase):
+	"""Paging through all items with cursors, also when sorting by a nullable field."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create(username="user")
+		customers = [Customer.objects.create(name=f"c{index}") for index in range(3)]
+		# every fourth order has no customer, so the pages end on `NULL` values
+		for index in range(12):
+			Order.objects.create(total_price=Decimal(index), customer=customers[index % 4] if index % 4 < 3 else None)
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def walk(self, query: str) -> tuple[list[int], list[int]]:
+		"""Follow the next cursors to the end and then the previous cursors back to the start, returning the primary keys in both directions."""
+		forward: list[int] = []
+		pages = []
+		response = self.client.get(f"/orders?_fields=id&_pagination=cursor&_pageSize=2&{query}")
+		while True:
+			self.assertEqual(response.status_code, 200, response.data)
+			pages.append([item["pk"] for item in response.data["items"]])
+			forward.extend(pages[-1])
+			if response.data["nextCursor"] is None:
+				break
+			response = self.client.get(f"/orders?_fields=id&_pagination=cursor&_pageSize=2&{query}&_cursor={response.data['nextCursor']}")
+		backward: list[int] = pages[-1]
+		while response.data["prevCursor"] is not None:
+			response = self.client.get(f"/orders?_fields=id&_pagination=cursor&_pageSize=2&{query}&_cursor={response.data['prevCursor']}")
+			self.assertEqual(response.status_code, 200, response.data)
+			backward = [item["pk"] for item in response.data["items"]] + backward
+		return forward, backward
+
+	def expected(self, descending: bool) -> list[int]:
+		orders = list(Order.objects.all())
+		with_customer = sorted((order for order in orders if order.customer_id is not None), key=lambda order: (order.customer_id, order.pk), reverse=descending)
+		without_customer = sorted((order.pk for order in orders if order.customer_id is None), reverse=descending)
+		# `NULL` values are ordered like the largest values
+		pks = [order.pk for order in with_customer]
+		return without_customer + pks if descending else pks + without_customer
+
+	def test_nullable_sort_field_ascending(self):
+		forward, backward = self.walk("_sortBy=customer")
+		self.assertEqual(forward, self.expected(False))
+		self.assertEqual(backward, forward)
+
+	def test_nullable_sort_field_descending(self):
+		forward, backward = self.walk("_sortBy=customer&_sortDir=desc")
+		self.assertEqual(forward, self.expected(True))
+		self.assertEqual(backward, forward)
+
+	def test_sort_by_pk(self):
+		forward, backward = self.walk("")
+		self.assertEqual(forward, sorted(Order.objects.values_list("pk", flat=True)))
+		self.assertEqual(backward, forward)
+
+	def test_invalid_cursor(self):
+		response = self.client.get("/orders?_fields=id&_pagination=cursor&_cursor=garbage")
+		self.assertEqual(response.status_code, 400)
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ui_migrations.utils import get_query_plan
+from .testapp.models import Customer, Order, Tag
+
+
+class QueryPlanTests(TestCase):
+	"""The queries of the list and item endpoints don't grow with the number of items."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.admin = User.objects.create(username="admin")
+		cls.admin.groups.add(Group.objects.create(name="admin"))
+		tags = [Tag.objects.create(label="a"), Tag.objects.create(label="b")]
+		for index in range(25):
+			order = Order.objects.create(total_price=Decimal(index), customer=Customer.objects.create(name=f"c{index}"))
+			order.tags.set(tags)
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.admin)
+
+	def test_plan(self):
+		plan = get_query_plan(Order, ("id", "total_price", "customer", "tags"))
+		self.assertEqual(plan.select_related, ("customer",))
+		self.assertEqual(plan.prefetch_related, ("tags",))
+		self.assertEqual(plan.only, ("id", "total_price", "customer"))
+
+	def test_list_queries_are_fixed(self):
+		for page_size in (5, 20):
+			# count, page (with the customers joined) and tags
+			with self.subTest(page_size=page_size), self.assertNumQueries(3):
+				response = self.client.get(f"/orders?_fields=id,total_price,customer,tags&_pageSize={page_size}")
+			self.assertEqual(response.status_code, 200)
+			self.assertEqual(len(response.data["items"]), page_size)
+			self.assertEqual(response.data["items"][0]["customer"]["name"], "c0")
+			self.assertEqual([tag["label"] for tag in response.data["items"][0]["tags"]], ["a", "b"])
+
+	def test_cursor_list_queries_are_fixed(self):
+		for page_size in (5, 20):
+			# page (with the customers joined) and tags
+			with self.subTest(page_size=page_size), self.assertNumQueries(2):
+				response = self.client.get(f"/orders?_fields=id,customer,tags&_pagination=cursor&_pageSize={page_size}")
+			self.assertEqual(len(response.data["items"]), page_size)
+
+	def test_item_queries(self):
+		order = Order.objects.first()
+		# item (with the customer joined) and tags
+		with self.assertNumQueries(2):
+			response = self.client.get(f"/orders/{order.pk}?_fields=id,customer,tags")
+		self.assertEqual(response.data["customer"]["name"], "c0")
+		self.assertEqual(len(response.data["tags"]), 2)
+
+	def test_scalar_fields_without_serializer(self):
+		order = Order.objects.first()
+		# a single query without counting for the item, the list needs the count as well
+		with self.assertNumQueries(1):
+			response = self.client.get(f"/orders/{order.pk}?_fields=id,total_price")
+		self.assertEqual(response.data, {"id": order.pk, "total_price": "0.00", "pk": order.pk})
+		with self.assertNumQueries(2):
+			response = self.client.get("/orders?_fields=id,status&_pageSize=20")
+		self.assertEqual(len(response.data["items"]), 20)
@@ -0,0 +1,49 @@
+import datetime
+import json
+import unittest
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from ui_migrations.renderers import ORJSONRenderer, get_renderer_classes, orjson
+
+
+@unittest.skipIf(orjson is None, "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+	"""The `ORJSONRenderer` renders the same bytes as the `JSONRenderer`, except for the documented floats."""
+
+	def assertSameContent(self, data):
+		self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+	def test_same_content(self):
+		for data in (
+			{"items": [{"id": 1, "done": True, "note": None}], "totalItems": 1, "page": 1},
+			{"price": Decimal("12.50"), "big": Decimal("1E+3"), "negative": Decimal("-0.001")},
+			{"at": datetime.datetime(2024, 5, 6, 7, 8, 9, 123456), "aware": datetime.datetime(2024, 5, 6, 7, 8, 9, tzinfo=datetime.timezone.utc)},
+			{"day": datetime.date(2024, 5, 6), "time": datetime.time(7, 8, 9), "duration": datetime.timedelta(days=1, seconds=5)},
+			{"uuid": uuid.UUID(int=1)},
+			{"text": "Grüße, 東京 😀", "quote": '"\\/\n\t', "control": "\x00\x1f\x7f"},
+			{"separators": "a\u2028b\u2029c"},
+			{"floats": [0.0, -0.0, 1.0, 0.1, 1 / 3, 123456.789, 1e15, 2.5e-3]},
+		):
+			with self.subTest(data=data):
+				self.assertSameContent(data)
+		self.assertEqual(ORJSONRenderer().render(None), JSONRenderer().render(None))
+
+	def test_different_floats(self):
+		# exponents are written differently, but parse to the same values
+		for value in (1e16, 1e300, 1e-5, 3.2e-5):
+			with self.subTest(value=value):
+				content = ORJSONRenderer().render([value])
+				self.assertNotEqual(content, JSONRenderer().render([value]))
+				self.assertEqual(json.loads(content), [value])
+		self.assertEqual(ORJSONRenderer().render([float("nan")]), b"[null]")
+		with self.assertRaises(ValueError):
+			JSONRenderer().render([float("nan")])
+
+	def test_opt_in(self):
+		self.assertNotIn(ORJSONRenderer, get_renderer_classes())
+		with override_settings(UI_MIGRATIONS_ORJSON=True):
+			self.assertIs(get_renderer_classes()[0], ORJSONRenderer)
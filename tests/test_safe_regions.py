@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase
+
+from ui_migrations.safe_regions import find_safe_regions, merge_safe_regions
+
+
+def region(name: str | None, content: str, html: bool = False) -> str:
+	"""Create a safe region with the `content`, marked like in scripts or like in HTML."""
+	label = f" {name}" if name else ""
+	if html:
+		return f"<!-- SAFE REGION BEGIN{label} -->{content}<!-- SAFE REGION END -->"
+	return f"/* SAFE REGION BEGIN{label} */{content}/* SAFE REGION END */"
+
+
+class SafeRegionsTests(SimpleTestCase):
+	"""Finding the safe regions in generated code and taking over their contents when the code is generated again."""
+
+	def test_find(self):
+		code = "a" + region("first", "1") + "b" + region(None, "2", html=True) + "c"
+		self.assertEqual(
+			[(safe_region.name, code[safe_region.content_start:safe_region.content_end]) for safe_region in find_safe_regions(code)],
+			[("first", "1"), (None, "2")],
+		)
+
+	def test_named_regions_are_matched_by_name(self):
+		old_code = "old\n" + region("imports", "import x") + "\n" + region("methods", "custom()") + "\n"
+		new_code = "new\n" + region("methods", "") + "\n" + region("added", "generated") + "\n" + region("imports", "") + "\n"
+		merged_code, removed_names = merge_safe_regions(new_code, old_code)
+		self.assertEqual(merged_code, "new\n" + region("methods", "custom()") + "\n" + region("added", "generated") + "\n" + region("imports", "import x") + "\n")
+		self.assertEqual(removed_names, [])
+
+	def test_legacy_unnamed_regions_are_matched_by_position(self):
+		old_code = "old\n" + region(None, "first") + "\n" + region(None, "second", html=True) + "\n"
+		new_code = "new\n" + region("script", "") + "\n" + region("template", "", html=True) + "\n"
+		merged_code, removed_names = merge_safe_regions(new_code, old_code)
+		self.assertEqual(merged_code, "new\n" + region("script", "first") + "\n" + region("template", "second", html=True) + "\n")
+		self.assertEqual(removed_names, [])
+		# but only if their number is the same
+		with self.assertRaisesMessage(ValueError, "different number of unnamed safe regions"):
+			merge_safe_regions(new_code + region("third", ""), old_code)
+
+	def test_removed_regions_are_reported(self):
+		old_code = region("kept", "a") + region("removed", "custom()") + region("empty", "\n\t")
+		merged_code, removed_names = merge_safe_regions(region("kept", ""), old_code)
+		self.assertEqual(merged_code, region("kept", "a"))
+		# empty safe regions have nothing to lose
+		self.assertEqual(removed_names, ["removed"])
+
+	def test_invalid_markers(self):
+		for code, message in (
+			(region("a", "1") + region("a", "2"), "Safe region 'a' ending in line 1 exists more than once."),
+			("/* SAFE REGION BEGIN a */\n", "Safe region 'a' does not end."),
+			("/* SAFE REGION BEGIN */\n", "Safe region does not end."),
+			("\n/* SAFE REGION END */", "Safe region ending in line 2 has not begun."),
+			("/* SAFE REGION BEGIN a */\n/* SAFE REGION BEGIN b */", "Safe region beginning in line 2 is nested in another safe region."),
+			("/* SAFE REGION BEGIN a *//* SAFE REGION END b */", "Safe region ending in line 1 is named 'b', but the safe region that began is named 'a'."),
+		):
+			with self.subTest(code=code):
+				with self.assertRaisesMessage(ValueError, message):
+					find_safe_regions(code)
+				# in the existing code as well as in the generated code
+				with self.assertRaisesMessage(ValueError, message):
+					merge_safe_regions(region("a", ""), code)
+				with self.assertRaisesMessage(ValueError, message):
+					merge_safe_regions(code, region("a", ""))
@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase
+
+from ui_migrations.utils import AccessTable, SerializerCache
+from .testapp.models import Customer, Order
+
+
+class SerializerCacheTests(SimpleTestCase):
+	"""The generated serializer classes are reused per model and fields, and the least recently used ones are evicted."""
+
+	def setUp(self):
+		self.cache = SerializerCache(maxsize=2)
+
+	def test_counters(self):
+		first = self.cache.get(Order, ["id", "status"])
+		self.assertEqual(self.cache.info(), {"hits": 0, "misses": 1, "size": 1, "maxsize": 2})
+		# blanks and duplicates are normalized away
+		self.assertIs(self.cache.get(Order, ["id", " status", "status", ""]), first)
+		self.assertEqual(self.cache.info(), {"hits": 1, "misses": 1, "size": 1, "maxsize": 2})
+		self.assertIsNot(self.cache.get(Customer, ["id"]), self.cache.get(Order, ["id"]))
+		self.assertEqual(self.cache.info(), {"hits": 1, "misses": 3, "size": 2, "maxsize": 2})
+		self.cache.clear()
+		self.assertEqual(self.cache.info(), {"hits": 0, "misses": 0, "size": 0, "maxsize": 2})
+
+	def test_field_order_is_kept(self):
+		self.assertEqual(list(self.cache.get(Order, ["status", "id"])().fields), ["status", "id", "pk"])
+		self.assertEqual(list(self.cache.get(Order, ["id", "status"])().fields), ["id", "status", "pk"])
+		self.assertEqual(self.cache.info()["misses"], 2)
+
+	def test_eviction_order(self):
+		first = self.cache.get(Order, ["id"])
+		second = self.cache.get(Order, ["status"])
+		# using the first one again makes the second one the least recently used
+		self.assertIs(self.cache.get(Order, ["id"]), first)
+		self.cache.get(Order, ["done"])
+		self.assertEqual(self.cache.info()["size"], 2)
+		self.assertIs(self.cache.get(Order, ["id"]), first)
+		self.assertEqual(self.cache.info()["misses"], 3)
+		self.assertIsNot(self.cache.get(Order, ["status"]), second)
+		self.assertEqual(self.cache.info()["misses"], 4)
+		# which has evicted the `done` serializer, while the first one is still cached
+		self.assertIs(self.cache.get(Order, ["id"]), first)
+		self.assertEqual(self.cache.info(), {"hits": 3, "misses": 4, "size": 2, "maxsize": 2})
+
+	def test_role_sets(self):
+		access = AccessTable.compile(
+			addable_by_roles=set(),
+			removable_by_roles=set(),
+			modifiable_by_roles={},
+			visible_by_roles={"id": True, "status": True, "note": {"admin"}, "total_price": {"admin", "clerk"}},
+		)
+		def serializer(roles: frozenset[str]):
+			return self.cache.get(Order, sorted(access.visible_fields(roles)))
+		admin = serializer(frozenset({"admin", "clerk"}))
+		clerk = serializer(frozenset({"clerk"}))
+		self.assertIsNot(admin, clerk)
+		self.assertEqual(set(admin().fields), {"id", "status", "note", "total_price", "pk"})
+		self.assertEqual(set(clerk().fields), {"id", "status", "total_price", "pk"})
+		# role sets with the same visible fields share the serializer
+		self.assertIs(serializer(frozenset({"clerk", "admin"})), admin)
+		self.assertIs(serializer(frozenset({"admin"})), admin)
+		self.assertIs(serializer(frozenset({"clerk", "unknown"})), clerk)
+		self.assertEqual(self.cache.info(), {"hits": 3, "misses": 2, "size": 2, "maxsize": 2})
@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class Customer(models.Model):
+	name = models.CharField(max_length=50)
+
+
+class Tag(models.Model):
+	label = models.CharField(max_length=50)
+
+
+class Order(models.Model):
+	STATUS = [("new", "New"), ("paid", "Paid"), ("shipped", "Shipped")]
+	total_price = models.DecimalField(max_digits=8, decimal_places=2)
+	status = models.CharField(max_length=10, choices=STATUS, default="new")
+	done = models.BooleanField(default=False)
+	note = models.CharField(max_length=100, blank=True)
+	customer = models.ForeignKey(Customer, on_delete=models.CASCADE, null=True)
+	tags = models.ManyToManyField(Tag, blank=True)
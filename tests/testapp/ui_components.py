@@ -0,0 +1,26 @@
+import os
+
+import ui_migrations
+from .models import Order
+
+
+class OrderTable(ui_migrations.DataTable):
+	model = Order
+	addable_by_roles = ["admin"]
+	removable_by_roles = ["admin"]
+	fields_options = [
+		ui_migrations.DataTable.FieldOptions(field_name="id", sortable=True, auto_generated=True),
+		ui_migrations.DataTable.FieldOptions(field_name="total_price", sortable=True, modifiable_by_roles=["admin"]),
+		ui_migrations.DataTable.FieldOptions(field_name="status", modifiable_by_roles=["admin"], filterable=True),
+		ui_migrations.DataTable.FieldOptions(field_name="done", modifiable_by_roles=["admin"]),
+		ui_migrations.DataTable.FieldOptions(field_name="note", visible_by_roles=["admin"], modifiable_by_roles=["admin"]),
+		ui_migrations.DataTable.FieldOptions(field_name="customer", sortable=True, modifiable_by_roles=["admin"]),
+		ui_migrations.DataTable.FieldOptions(field_name="tags", modifiable_by_roles=["admin"]),
+	]
+	actions_options = [
+		ui_migrations.ActionOptions(display_name="Next Status", roles=["admin"], actions=[ui_migrations.IterateAction(field_name="status")]),
+	]
+
+
+components = [OrderTable(ui_framework=ui_migrations.UiFramework.VUE)]
+frontends = {ui_migrations.UiFramework.VUE: os.path.join(os.path.dirname(__file__), "frontend")}
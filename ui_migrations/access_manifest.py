@@ -0,0 +1,182 @@
+import dataclasses
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Literal, Iterable
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Model
+
+from .components import UiComponent, ActionOptions
+from .actions import Action, IterateAction, ToggleAction, OpenUrlAction, SetCurrentDateAction
+
+
+logger = logging.getLogger(__name__)
+
+ACCESS_MANIFEST_VERSION = 1
+"""Version of the format of the access manifest, manifests with another version are ignored"""
+
+ACTION_CLASSES: dict[str, type[Action]] = {
+	action_class._type: action_class # type: ignore
+	for action_class in (IterateAction, ToggleAction, OpenUrlAction, SetCurrentDateAction)
+}
+"""Action classes by their type, for loading the actions from the access manifest"""
+
+
+@dataclass
+class ModelAccess:
+	"""Access specifications for a model."""
+	addable_by_roles: set[str]
+	removable_by_roles: set[str]
+	modifiable_by_roles: dict[str, set[str]]
+	visible_by_roles: dict[str, set[str] | Literal[True]]
+	actions_options: dict[str, list[ActionOptions]]
+	sortable_fields: set[str]
+	filterable_lookups: dict[str, set[str]]
+
+
+def get_models_access(components: Iterable[UiComponent]) -> dict[type[Model], ModelAccess]:
+	"""Merge the access specifications of all `components` by their model."""
+	models_to_access: dict[type[Model], ModelAccess] = {}
+	for component in components:
+		if component.model is None:
+			continue
+		fields_options = getattr(component, "fields_options", [])
+
+		# if the model is not in the dict yet, add it without any access
+		model_access = models_to_access.setdefault(component.model, ModelAccess(set(), set(), {}, {}, {}, set(), {}))
+		model_access.addable_by_roles.update(getattr(component, "addable_by_roles", set()))
+		model_access.removable_by_roles.update(getattr(component, "removable_by_roles", set()))
+		# add the actions of the component
+		model_access.actions_options[component.name] = list(getattr(component, "actions_options", []))
+		if component.spec is not None:
+			model_access.sortable_fields.update(component.spec.sortable_fields)
+			for field_name, lookups in component.spec.filterable_lookups.items():
+				model_access.filterable_lookups.setdefault(field_name, set()).update(lookups)
+		for field_options in fields_options:
+			if hasattr(field_options, "modifiable_by_roles"):
+				model_access.modifiable_by_roles.setdefault(field_options.field_name, set()).update(field_options.modifiable_by_roles)
+			if hasattr(field_options, "visible_by_roles"):
+				# a field that is visible to all roles in any component stays visible to all roles
+				visible_by_roles = model_access.visible_by_roles.get(field_options.field_name, set())
+				if visible_by_roles == True or field_options.visible_by_roles == True:
+					model_access.visible_by_roles[field_options.field_name] = True
+				else:
+					model_access.visible_by_roles[field_options.field_name] = visible_by_roles | set(field_options.visible_by_roles) # type: ignore
+	return models_to_access
+
+
+def get_access_manifest_path() -> str | None:
+	"""
+	Get the path of the access manifest, as configured by the `UI_MIGRATIONS_ACCESS_MANIFEST` setting.
+	Defaults to `None`, which disables the manifest, since it is only known to be current while the access specifications are declared in the `ui_components` modules themselves.
+	"""
+	return getattr(settings, "UI_MIGRATIONS_ACCESS_MANIFEST", None)
+
+
+def get_sources_fingerprint() -> dict[str, str | None]:
+	"""Hash the `ui_components` module (or all modules of the `ui_components` package) of every app (`None` for apps without one), without importing the modules."""
+	fingerprint: dict[str, str | None] = {}
+	for app_config in apps.get_app_configs():
+		spec = importlib.util.find_spec(f"{app_config.name}.ui_components")
+		if spec is None or spec.origin is None or not os.path.isfile(spec.origin):
+			fingerprint[app_config.label] = None
+			continue
+		if not spec.submodule_search_locations:
+			with open(spec.origin, "rb") as f:
+				fingerprint[app_config.label] = hashlib.sha256(f.read()).hexdigest()
+			continue
+		# a package may declare the components in any of its modules, so all of them are hashed with their paths
+		package_dir = os.path.dirname(spec.origin)
+		sha256 = hashlib.sha256()
+		for dir_path, dir_names, file_names in os.walk(package_dir):
+			dir_names.sort()
+			for file_name in sorted(file_names):
+				if file_name.endswith(".py"):
+					file_path = os.path.join(dir_path, file_name)
+					with open(file_path, "rb") as f:
+						sha256.update(os.path.relpath(file_path, package_dir).encode() + b"\0" + hashlib.sha256(f.read()).digest())
+		fingerprint[app_config.label] = sha256.hexdigest()
+	return fingerprint
+
+
+def write_access_manifest(models_to_access: dict[type[Model], ModelAccess]) -> str | None:
+	"""Write the access manifest (if it is enabled and changed) and return its path."""
+	if (manifest_path := get_access_manifest_path()) is None:
+		return None
+	manifest = {
+		"version": ACCESS_MANIFEST_VERSION,
+		"sources": get_sources_fingerprint(),
+		"models": {
+			model._meta.label: {
+				"addable_by_roles": sorted(model_access.addable_by_roles),
+				"removable_by_roles": sorted(model_access.removable_by_roles),
+				"modifiable_by_roles": {field_name: sorted(roles) for field_name, roles in model_access.modifiable_by_roles.items()},
+				"visible_by_roles": {field_name: roles if roles == True else sorted(roles) for field_name, roles in model_access.visible_by_roles.items()},
+				"actions_options": {
+					component_name: [dataclasses.asdict(action_options) for action_options in actions_options]
+					for component_name, actions_options in model_access.actions_options.items()
+				},
+				"sortable_fields": sorted(model_access.sortable_fields),
+				"filterable_lookups": {field_name: sorted(lookups) for field_name, lookups in model_access.filterable_lookups.items()},
+			}
+			for model, model_access in sorted(models_to_access.items(), key=lambda item: item[0]._meta.label)
+		},
+	}
+	content = json.dumps(manifest, indent="\t", sort_keys=True) + "\n"
+	try:
+		with open(manifest_path, "r") as f:
+			if f.read() == content:
+				return manifest_path
+	except FileNotFoundError:
+		pass
+	with open(manifest_path, "w") as f:
+		f.write(content)
+	return manifest_path
+
+
+def load_access_manifest() -> dict[type[Model], ModelAccess] | None:
+	"""Load the access specifications from the access manifest, or `None` if there is no manifest or it is stale (so that the components have to be inspected instead)."""
+	if (manifest_path := get_access_manifest_path()) is None:
+		return None
+	try:
+		with open(manifest_path, "r") as f:
+			manifest = json.load(f)
+	except (FileNotFoundError, json.JSONDecodeError):
+		logger.warning("The access manifest %s is missing or invalid, so the components are inspected instead. Run migrate_ui to write it.", manifest_path)
+		return None
+	if manifest.get("version") != ACCESS_MANIFEST_VERSION or manifest.get("sources") != get_sources_fingerprint():
+		logger.warning("The access manifest %s is outdated, so the components are inspected instead. Run migrate_ui to update it.", manifest_path)
+		return None
+
+	def load_action(action: dict) -> Action:
+		fields = {name: value for name, value in action.items() if name != "_type"}
+		return ACTION_CLASSES[action["_type"]](**fields)
+
+	try:
+		return {
+			apps.get_model(label): ModelAccess(
+				addable_by_roles=set(model_access["addable_by_roles"]),
+				removable_by_roles=set(model_access["removable_by_roles"]),
+				modifiable_by_roles={field_name: set(roles) for field_name, roles in model_access["modifiable_by_roles"].items()},
+				visible_by_roles={field_name: True if roles == True else set(roles) for field_name, roles in model_access["visible_by_roles"].items()},
+				actions_options={
+					component_name: [
+						ActionOptions(options["display_name"], options["roles"], [load_action(action) for action in options["actions"]])
+						for options in actions_options
+					]
+					for component_name, actions_options in model_access["actions_options"].items()
+				},
+				sortable_fields=set(model_access["sortable_fields"]),
+				filterable_lookups={field_name: set(lookups) for field_name, lookups in model_access["filterable_lookups"].items()},
+			)
+			for label, model_access in manifest["models"].items()
+		}
+	except (KeyError, LookupError, TypeError):
+		# the manifest doesn't match the installed apps or the actions anymore
+		logger.warning("The access manifest %s doesn't match the installed apps, so the components are inspected instead. Run migrate_ui to update it.", manifest_path)
+		return None
@@ -2,6 +2,10 @@ from abc import ABC
 from typing import Literal, Any
 from dataclasses import dataclass, field
 
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.db.models.functions import Cast, Now
+
 
 @dataclass
 class Action(ABC):
@@ -9,6 +13,10 @@ class Action(ABC):
 	_type: str
 	"""Type of the action (statically set by the subclasses)"""
 
+	def get_update(self, model: type[models.Model]) -> tuple[str, Any] | None:
+		"""Get the field name and the expression for updating the items of the `model` on the server (or `None` if the action only runs in the UI)."""
+		return None
+
 
 @dataclass
 class IterateAction(Action):
@@ -17,12 +25,33 @@ class IterateAction(Action):
 	direction: Literal["forward", "backward"] = "forward"
 	_type: str = field(default="iterate", init=False)
 
+	def get_update(self, model: type[models.Model]) -> tuple[str, Any] | None:
+		model_field = model._meta.get_field(self.field_name)
+		choices = [choice for choice, _ in getattr(model_field, "flatchoices", [])]
+		if not choices:
+			raise ImproperlyConfigured(f"Cannot iterate over field '{self.field_name}' of '{model.__name__}', as it has no choices.")
+		if self.direction == "backward":
+			choices.reverse()
+		# map every choice to the next one (circular)
+		return self.field_name, models.Case(
+			*(models.When(**{self.field_name: choice}, then=models.Value(next_choice)) for choice, next_choice in zip(choices, choices[1:] + choices[:1])),
+			default=models.F(self.field_name),
+			output_field=model_field, # type: ignore
+		)
+
 @dataclass
 class ToggleAction(Action):
 	"""Switch between TRUE and FALSE of a field."""
 	field_name: str
 	_type: str = field(default="toggle", init=False)
 
+	def get_update(self, model: type[models.Model]) -> tuple[str, Any] | None:
+		return self.field_name, models.Case(
+			models.When(**{self.field_name: True}, then=models.Value(False)),
+			default=models.Value(True),
+			output_field=models.BooleanField(),
+		)
+
 @dataclass
 class OpenUrlAction(Action):
 	"""Open a URL. Can contain a field name in curly braces to insert the value of the field in the URL."""
@@ -35,3 +64,8 @@ class SetCurrentDateAction(Action):
 	"""Set the current date on a date time field."""
 	field_name: str
 	_type: str = field(default="set_current_date", init=False)
+
+	def get_update(self, model: type[models.Model]) -> tuple[str, Any] | None:
+		if model._meta.get_field(self.field_name).get_internal_type() == "DateField":
+			return self.field_name, Cast(Now(), output_field=models.DateField())
+		return self.field_name, Now()
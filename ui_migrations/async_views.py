@@ -0,0 +1,78 @@
+import functools
+from typing import Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponseBase
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+def is_async_views_enabled() -> bool:
+	"""Check if the item and list endpoints are served by native async views, as configured by the `UI_MIGRATIONS_ASYNC_VIEWS` setting."""
+	return getattr(settings, "UI_MIGRATIONS_ASYNC_VIEWS", False)
+
+
+def async_api_view(http_method_names: list[str], renderer_classes: list[type[BaseRenderer]], content_negotiation_class: type[BaseContentNegotiation] | None = None):
+	"""
+	Decorator like `api_view` of Django REST framework for async views, which it doesn't support.
+	The request is authenticated and its permissions and throttles are checked in a thread (as they may query the database), then the view runs on the event loop.
+	Exceptions are handled and the response is rendered like by `api_view`. Responses that are not rendered by Django REST framework (e.g. streams) are returned as they are.
+	"""
+	methods = [method.upper() for method in http_method_names]
+
+	def decorator(func: Callable[..., Awaitable[HttpResponseBase]]) -> Callable[..., Awaitable[HttpResponseBase]]:
+		# the name and the description of the view (e.g. for `OPTIONS`) are taken from the function, like by `api_view`
+		AsyncAPIView = type(func.__name__, (APIView,), {
+			"__doc__": func.__doc__,
+			"renderer_classes": renderer_classes,
+			"http_method_names": [method.lower() for method in methods] + ["options"],
+			# the handlers are not methods of the class, so the allowed methods are listed explicitly
+			"allowed_methods": property(lambda self: methods + ["OPTIONS"]),
+			**({"content_negotiation_class": content_negotiation_class} if content_negotiation_class is not None else {}),
+		})
+
+		@sync_to_async
+		def initialize(http_request: HttpRequest, args: tuple, kwargs: dict) -> tuple[APIView, Request, Response | None]:
+			"""Initialize the request like `APIView.dispatch`, returning the response if it is already answered (by an error or for `OPTIONS`)."""
+			view = AsyncAPIView()
+			view.args = args
+			view.kwargs = kwargs
+			request = view.initialize_request(http_request, *args, **kwargs)
+			view.request = request
+			view.headers = view.default_response_headers
+			try:
+				view.initial(request, *args, **kwargs)
+				if request.method not in methods:
+					if request.method == "OPTIONS":
+						return view, request, view.options(request, *args, **kwargs)
+					raise MethodNotAllowed(request.method)
+			except Exception as exc:
+				return view, request, view.handle_exception(exc)
+			return view, request, None
+
+		@functools.wraps(func)
+		async def async_view(http_request: HttpRequest, *args, **kwargs) -> HttpResponseBase:
+			view, request, response = await initialize(http_request, args, kwargs)
+			if response is None:
+				try:
+					response = await func(request, *args, **kwargs)
+				except Exception as exc:
+					response = view.handle_exception(exc)
+			response = view.finalize_response(request, response, *args, **kwargs)
+			# responses that are not rendered by Django REST framework (e.g. `304 Not Modified` or streams) are returned as they are
+			if not isinstance(response, Response):
+				return response
+			# the browsable API renders forms, which may query the database
+			if isinstance(response.accepted_renderer, BrowsableAPIRenderer):
+				return await sync_to_async(response.render)() # type: ignore
+			return response.render() # type: ignore
+		# like `api_view`, the CSRF protection is left to the authentication (e.g. `SessionAuthentication`)
+		return csrf_exempt(async_view)
+
+	return decorator
@@ -0,0 +1,111 @@
+import re
+from typing import Any
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve, Resolver404
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .components import UiComponent
+from .ui_frameworks import UiFramework
+from .renderers import get_renderer_classes
+from .utils import get_user_roles
+
+
+MODEL_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+"""Pattern of the model names in batched queries, so that they can only address the item and list endpoints"""
+
+
+def get_batch_max_queries() -> int:
+	"""Get how many queries a batch may contain, as configured by the `UI_MIGRATIONS_BATCH_MAX_QUERIES` setting."""
+	return getattr(settings, "UI_MIGRATIONS_BATCH_MAX_QUERIES", 20)
+
+
+def is_valid_query(query: Any) -> bool:
+	"""Check if a query of a batch has a model name, an optional integer `pk` and optional `params`."""
+	return (
+		isinstance(query, dict)
+		and isinstance(query.get("model"), str) and MODEL_NAME_PATTERN.match(query["model"]) is not None
+		and (query.get("pk") is None or (isinstance(query["pk"], int) and not isinstance(query["pk"], bool)) or (isinstance(query["pk"], str) and query["pk"].isdigit()))
+		and isinstance(query.get("params", {}), dict)
+	)
+
+
+def create_query_request(request: Request, path: str, params: dict[str, Any]) -> HttpRequest:
+	"""Create a GET request for `path` with the query `params`, which is authenticated as the user of the batch `request` and shares its roles."""
+	query_request = HttpRequest()
+	query_request.method = "GET"
+	query_request.path = query_request.path_info = path
+	query_request.META = {**request._request.META, "REQUEST_METHOD": "GET", "PATH_INFO": path, "CONTENT_LENGTH": "0"}
+	query_request.GET = QueryDict(mutable=True)
+	for key, value in params.items():
+		query_request.GET[key] = str(value)
+	# the user is authenticated once for the whole batch (like the test client of Django REST framework forces it) ...
+	query_request._force_auth_user = request.user # type: ignore
+	query_request._force_auth_token = request.auth # type: ignore
+	# ... and its roles are only queried once
+	query_request._ui_migrations_roles = get_user_roles(request) # type: ignore
+	return query_request
+
+
+@api_view(['POST'])
+@renderer_classes(get_renderer_classes())
+def batch_view(request: Request):
+	"""
+	Run several item and list queries of the generated endpoints in one request and return their statuses and data in the same order.
+	Expects `{"queries": [{"model": "order", "pk": 1, "params": {"_fields": "id,status"}}, ...]}`, where `pk` is only given for item queries.
+	"""
+	data = request.data
+	queries = data.get("queries") if isinstance(data, dict) else None
+	if not isinstance(queries, list):
+		return Response(status=400, data={"error": "Expected a list of queries."})
+	if len(queries) > get_batch_max_queries():
+		return Response(status=400, data={"error": f"A batch can contain at most {get_batch_max_queries()} queries."})
+
+	results = []
+	for query in queries:
+		# a malformed query (e.g. of a component without a pk) only fails itself, not the other queries of the batch
+		if not is_valid_query(query):
+			results.append({"status": 400, "data": {"error": "Expected a query with a model name, an optional integer pk and optional params."}})
+			continue
+		path = f"/{query['model'].lower()}s" + (f"/{query['pk']}" if query.get("pk") is not None else "")
+		try:
+			match = resolve(path, urlconf="ui_migrations.urls")
+		except Resolver404:
+			results.append({"status": 404, "data": {"error": f"There are no endpoints for the model {query['model']}."}})
+			continue
+		query_request = create_query_request(request, path, query.get("params", {}))
+		# the views are async if `UI_MIGRATIONS_ASYNC_VIEWS` is enabled
+		if iscoroutinefunction(match.func):
+			response = async_to_sync(match.func)(query_request, *match.args, **match.kwargs)
+		else:
+			response = match.func(query_request, *match.args, **match.kwargs)
+		results.append({"status": response.status_code, "data": getattr(response, "data", None)})
+	return Response(data={"results": results})
+
+
+class BatchLoader(UiComponent):
+	"""Client side loader that coalesces the requests of the stores that are sent at the same time into a request to the batch endpoint. Generated by `migrate_ui` for every frontend that has stores."""
+
+	model = None
+
+	def __init__(self, *, ui_framework: UiFramework):
+		super().__init__("batchLoader", ui_framework=ui_framework)
+
+	def get_file_path(self, path: str) -> str:
+		return f"{path}/src/stores/{self.name}.ts"
+
+	def get_template_name(self) -> str:
+		match self.ui_framework:
+			case UiFramework.VUE:
+				return "vue/BatchLoader.ts.j2"
+			case f:
+				raise NotImplementedError(f"UI Framework '{f}' is not yet supported.")
+
+	def get_template_context(self) -> dict[str, Any]:
+		return {
+			"max_queries": get_batch_max_queries(),
+		}
@@ -0,0 +1,205 @@
+import functools
+import hashlib
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Hashable
+
+from django.conf import settings
+from django.core.cache import caches, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from .renderers import ORJSONRenderer
+
+
+logger = logging.getLogger(__name__)
+
+
+@functools.cache
+def warn_if_process_local(alias: str) -> None:
+	"""Warn once if the response cache with the `alias` only lives in the current process, where writes handled by other processes can't invalidate its responses."""
+	if isinstance(caches[alias], LocMemCache):
+		logger.warning(
+			"The response cache %r is local to each process, so writes handled by other processes (e.g. other workers) don't invalidate its responses "
+			"until UI_MIGRATIONS_RESPONSE_CACHE_TIMEOUT expires. Use a shared cache (e.g. Redis or Memcached) with multiple processes.",
+			alias,
+		)
+
+
+def get_response_cache() -> BaseCache | None:
+	"""Get the cache for responses, as configured by the `UI_MIGRATIONS_RESPONSE_CACHE` setting (the alias of a cache in `CACHES`), or `None` if responses are not cached."""
+	alias: str | None = getattr(settings, "UI_MIGRATIONS_RESPONSE_CACHE", None)
+	if not alias:
+		return None
+	warn_if_process_local(alias)
+	return caches[alias]
+
+
+def get_model_state(cache: BaseCache, model: type[models.Model]) -> tuple[str, int]:
+	"""Get the current version of the data of the `model` and the time (in seconds) it was last modified."""
+	key = f"ui_migrations:state:{model._meta.label_lower}"
+	state: tuple[str, int] | None = cache.get(key)
+	if state is None:
+		# the data is unknown to the cache, so treat it as modified now
+		state = (uuid.uuid4().hex, int(time.time()))
+		cache.add(key, state, None)
+		state = cache.get(key, state)
+	return state # type: ignore
+
+
+def invalidate_model(model: type[models.Model]) -> None:
+	"""Invalidate all cached responses of the `model` by giving its data a new version."""
+	if (cache := get_response_cache()) is not None:
+		key = f"ui_migrations:state:{model._meta.label_lower}"
+		previous_state: tuple[str, int] | None = cache.get(key)
+		# `Last-Modified` only has a resolution of seconds, so every modification has to be at least one second after the previous one
+		last_modified = max(int(time.time()), previous_state[1] + 1) if previous_state else int(time.time())
+		cache.set(key, (uuid.uuid4().hex, last_modified), None)
+
+
+def connect_invalidation_signals(model: type[models.Model]) -> None:
+	"""Invalidate the cached responses of the `model` whenever it, one of its related models or one of its many to many relations is saved or deleted."""
+	def invalidate(**kwargs) -> None:
+		invalidate_model(model)
+	dispatch_uid = f"ui_migrations:invalidate:{model._meta.label_lower}"
+	# nested items of related models are part of the responses as well
+	senders = {model} | {field.related_model for field in model._meta.get_fields() if field.is_relation and field.related_model}
+	for sender in senders:
+		post_save.connect(invalidate, sender=sender, weak=False, dispatch_uid=dispatch_uid)
+		post_delete.connect(invalidate, sender=sender, weak=False, dispatch_uid=dispatch_uid)
+	for field in model._meta.many_to_many:
+		m2m_changed.connect(invalidate, sender=field.remote_field.through, weak=False, dispatch_uid=dispatch_uid) # type: ignore
+
+
+def make_etag(content: bytes) -> str:
+	"""Create an ETag from the rendered `content` of a response."""
+	return quote_etag(hashlib.md5(content, usedforsecurity=False).hexdigest())
+
+
+def prerender(request: Request, response: Response) -> bytes:
+	"""
+	Render the `response` with the JSON renderer negotiated for the `request` ahead of `finalize_response`, so that the data is only rendered once and its ETag matches the bytes that are sent.
+	Other renderers (e.g. the browsable API) need the view and render the response later as usual, so the ETag is created from the data rendered as JSON instead.
+	"""
+	renderer = getattr(request, "accepted_renderer", None)
+	if not isinstance(renderer, (JSONRenderer, ORJSONRenderer)):
+		return JSONRenderer().render(response.data)
+	response.accepted_renderer = renderer
+	response.accepted_media_type = request.accepted_media_type
+	response.renderer_context = {"request": request, "response": response}
+	# setting the content marks the response as rendered
+	response.content = response.rendered_content
+	return response.content
+
+
+def get_rendering_key(request: Request) -> tuple[str | None, str | None]:
+	"""Get the format and the media type (with its parameters, e.g. `indent`) of the response to the `request`, which are part of the key of the cached response."""
+	renderer = getattr(request, "accepted_renderer", None)
+	return (getattr(renderer, "format", None), getattr(request, "accepted_media_type", None))
+
+
+def cache_entry(request: Request, response: Response) -> tuple[str, object, bytes | None, str | None]:
+	"""Create the cache entry of the `response`: its ETag, its data and, if it is rendered already, its content and content type."""
+	etag = make_etag(prerender(request, response))
+	if response.is_rendered:
+		return (etag, response.data, response.content, response["Content-Type"])
+	return (etag, response.data, None, None)
+
+
+def cached_response(request: Request, entry: tuple[str, object, bytes | None, str | None]) -> Response:
+	"""Create the response from the cache `entry`, with its cached content (if any) so that it is not rendered again."""
+	_, data, content, content_type = entry
+	response = Response(data=data)
+	if content is not None:
+		response.accepted_renderer = request.accepted_renderer
+		response.accepted_media_type = request.accepted_media_type
+		response.renderer_context = {"request": request, "response": response}
+		response.content = content
+		response["Content-Type"] = content_type
+	return response
+
+
+def conditional_response(request: Request, model: type[models.Model], key: Hashable, get_response: Callable[[], Response]) -> HttpResponseBase:
+	"""
+	Get the response of a GET request from the cache (if configured) or from `get_response`, identified by the `model` and the normalized request parameters in `key`.
+	Adds an `ETag` of the rendered content (and a `Last-Modified` header if the response cache is configured) and answers with `304 Not Modified` if the client has the current version.
+	"""
+	cache = get_response_cache()
+	last_modified: int | None = None
+	if cache is None:
+		response = get_response()
+		if response.status_code != 200:
+			return response
+		etag = make_etag(prerender(request, response))
+	else:
+		version, last_modified = get_model_state(cache, model)
+		cache_key = "ui_migrations:response:" + hashlib.md5(repr((model._meta.label_lower, version, key, get_rendering_key(request))).encode(), usedforsecurity=False).hexdigest()
+		if (entry := cache.get(cache_key)) is None:
+			response = get_response()
+			if response.status_code != 200:
+				return response
+			entry = cache_entry(request, response)
+			cache.set(cache_key, entry, getattr(settings, "UI_MIGRATIONS_RESPONSE_CACHE_TIMEOUT", 300))
+		else:
+			response = cached_response(request, entry)
+		etag = entry[0]
+
+	response["ETag"] = etag
+	if last_modified is not None:
+		response["Last-Modified"] = http_date(last_modified)
+	return get_conditional_response(request._request, etag=etag, last_modified=last_modified, response=response) # type: ignore
+
+
+async def aget_model_state(cache: BaseCache, model: type[models.Model]) -> tuple[str, int]:
+	"""Async version of `get_model_state`."""
+	key = f"ui_migrations:state:{model._meta.label_lower}"
+	state: tuple[str, int] | None = await cache.aget(key)
+	if state is None:
+		state = (uuid.uuid4().hex, int(time.time()))
+		await cache.aadd(key, state, None)
+		state = await cache.aget(key, state)
+	return state # type: ignore
+
+
+async def ainvalidate_model(model: type[models.Model]) -> None:
+	"""Async version of `invalidate_model`."""
+	if (cache := get_response_cache()) is not None:
+		key = f"ui_migrations:state:{model._meta.label_lower}"
+		previous_state: tuple[str, int] | None = await cache.aget(key)
+		last_modified = max(int(time.time()), previous_state[1] + 1) if previous_state else int(time.time())
+		await cache.aset(key, (uuid.uuid4().hex, last_modified), None)
+
+
+async def aconditional_response(request: Request, model: type[models.Model], key: Hashable, get_response: Callable[[], Awaitable[Response]]) -> HttpResponseBase:
+	"""Async version of `conditional_response`, with the response created by the coroutine function `get_response`."""
+	cache = get_response_cache()
+	last_modified: int | None = None
+	if cache is None:
+		response = await get_response()
+		if response.status_code != 200:
+			return response
+		etag = make_etag(prerender(request, response))
+	else:
+		version, last_modified = await aget_model_state(cache, model)
+		cache_key = "ui_migrations:response:" + hashlib.md5(repr((model._meta.label_lower, version, key, get_rendering_key(request))).encode(), usedforsecurity=False).hexdigest()
+		if (entry := await cache.aget(cache_key)) is None:
+			response = await get_response()
+			if response.status_code != 200:
+				return response
+			entry = cache_entry(request, response)
+			await cache.aset(cache_key, entry, getattr(settings, "UI_MIGRATIONS_RESPONSE_CACHE_TIMEOUT", 300))
+		else:
+			response = cached_response(request, entry)
+		etag = entry[0]
+
+	response["ETag"] = etag
+	if last_modified is not None:
+		response["Last-Modified"] = http_date(last_modified)
+	return get_conditional_response(request._request, etag=etag, last_modified=last_modified, response=response) # type: ignore
@@ -0,0 +1,169 @@
+import asyncio
+import dataclasses
+import functools
+import json
+import threading
+from typing import AsyncIterator, Literal, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.signals import post_save, post_delete
+from django.http import StreamingHttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from .async_views import async_api_view
+
+
+@dataclasses.dataclass
+class ChangeEvent:
+	"""A change of an item of a model."""
+	model: str
+	"""Label of the model, e.g. `shop.Order`"""
+	type: Literal["create", "update", "delete", "reset"]
+	"""Kind of the change (`reset` if events were lost and the items have to be loaded again)"""
+	pk: object = None
+	"""Primary key of the changed item"""
+	item: dict | None = None
+	"""Serialized item after the change (`None` for deletions)"""
+
+
+class ChangePublisher:
+	"""Base class for publishing the changes of items to the subscribers of the change feeds. Subclass it to distribute the changes between processes."""
+	def publish(self, event: ChangeEvent) -> None:
+		"""Send the `event` to all subscribers of its model. Called from synchronous code."""
+		...
+	def subscribe(self, model_label: str, keepalive: float) -> AsyncIterator[ChangeEvent | None]:
+		"""Iterate over the events of the model with `model_label`, yielding `None` if there was no event for `keepalive` seconds."""
+		...
+
+
+class _Subscriber:
+	"""Queue of the events for a subscriber, which is filled from any thread."""
+	def __init__(self, loop: asyncio.AbstractEventLoop, max_size: int):
+		self.loop = loop
+		self.queue: asyncio.Queue[ChangeEvent] = asyncio.Queue(max_size)
+		self.overflowed = False
+	def put(self, event: ChangeEvent) -> None:
+		try:
+			self.queue.put_nowait(event)
+		except asyncio.QueueFull:
+			# the subscriber is too slow, so it has to reload its items instead
+			self.overflowed = True
+
+
+class InProcessPublisher(ChangePublisher):
+	"""Publishes the changes to the subscribers in the same process (the default)."""
+
+	def __init__(self, max_queue_size: int = 1000):
+		self.max_queue_size = max_queue_size
+		self._subscribers: dict[str, set[_Subscriber]] = {}
+		self._lock = threading.Lock()
+
+	def publish(self, event: ChangeEvent) -> None:
+		with self._lock:
+			subscribers = list(self._subscribers.get(event.model, ()))
+		for subscriber in subscribers:
+			try:
+				subscriber.loop.call_soon_threadsafe(subscriber.put, event)
+			except RuntimeError:
+				# the event loop of the subscriber is closed already
+				pass
+
+	async def subscribe(self, model_label: str, keepalive: float) -> AsyncIterator[ChangeEvent | None]:
+		subscriber = _Subscriber(asyncio.get_running_loop(), self.max_queue_size)
+		with self._lock:
+			self._subscribers.setdefault(model_label, set()).add(subscriber)
+		try:
+			while True:
+				try:
+					event = await asyncio.wait_for(subscriber.queue.get(), keepalive)
+				except asyncio.TimeoutError:
+					yield None
+					continue
+				if subscriber.overflowed:
+					while not subscriber.queue.empty():
+						subscriber.queue.get_nowait()
+					subscriber.overflowed = False
+					yield ChangeEvent(model_label, "reset")
+					continue
+				yield event
+		finally:
+			with self._lock:
+				self._subscribers[model_label].discard(subscriber)
+
+
+def is_change_feed_enabled() -> bool:
+	"""Check if the models have change feeds, as configured by the `UI_MIGRATIONS_CHANGE_FEED` setting."""
+	return getattr(settings, "UI_MIGRATIONS_CHANGE_FEED", False)
+
+
+@functools.cache
+def get_change_publisher() -> ChangePublisher:
+	"""Get the publisher of the changes, as configured by the `UI_MIGRATIONS_CHANGE_PUBLISHER` setting (the dotted path of a `ChangePublisher` subclass)."""
+	publisher_class: type[ChangePublisher] = import_string(getattr(settings, "UI_MIGRATIONS_CHANGE_PUBLISHER", "ui_migrations.change_feed.InProcessPublisher"))
+	return publisher_class()
+
+
+def publish_changes(model: type[models.Model], event_type: Literal["create", "update", "delete"], items: list[dict]) -> None:
+	"""Publish the changes of the serialized `items` (or only their primary keys for deletions) once the current transaction is committed."""
+	publisher = get_change_publisher()
+	def publish() -> None:
+		for item in items:
+			publisher.publish(ChangeEvent(model._meta.label, event_type, item["pk"], None if event_type == "delete" else item))
+	transaction.on_commit(publish)
+
+
+def connect_change_signals(model: type[models.Model], serialize: Callable[[models.Model], dict]) -> None:
+	"""Publish the changes of the items of the `model` whenever they are saved or deleted, serialized with `serialize`."""
+	def on_save(instance: models.Model, created: bool, **kwargs) -> None:
+		publish_changes(model, "create" if created else "update", [serialize(instance)])
+	def on_delete(instance: models.Model, **kwargs) -> None:
+		publish_changes(model, "delete", [{"pk": instance.pk}])
+	dispatch_uid = f"ui_migrations:change_feed:{model._meta.label_lower}"
+	post_save.connect(on_save, sender=model, weak=False, dispatch_uid=dispatch_uid)
+	post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=dispatch_uid)
+
+
+class EventStreamContentNegotiation(BaseContentNegotiation):
+	"""Select the JSON renderer for the errors of the change feeds, whatever the client accepts (e.g. `text/event-stream` for the events)."""
+	def select_parser(self, request, parsers):
+		return parsers[0] if parsers else None
+	def select_renderer(self, request, renderers, format_suffix=None):
+		return renderers[0], renderers[0].media_type
+
+
+def create_change_feed_view(model: type[models.Model], get_visible_fields: Callable[[Request], frozenset[str]], keepalive: float = 15):
+	"""
+	Create an async view that streams the changes of the items of the `model` as Server-Sent Events.
+	The request is authenticated and its permissions and throttles are checked like by the other endpoints.
+	The items of the events only contain the fields returned by `get_visible_fields` for the subscribing request. Requires an ASGI server.
+	"""
+	@async_api_view(["GET"], [JSONRenderer], EventStreamContentNegotiation)
+	async def change_feed_view(request: Request) -> StreamingHttpResponse:
+		"""Stream the changes of the items as Server-Sent Events."""
+		visible_fields = await sync_to_async(get_visible_fields)(request)
+		encoder = JSONEncoder()
+
+		async def stream() -> AsyncIterator[str]:
+			# comments keep the connection open through proxies while there are no changes
+			yield ": connected\n\n"
+			async for event in get_change_publisher().subscribe(model._meta.label, keepalive):
+				if event is None:
+					yield ": keepalive\n\n"
+					continue
+				item = {field: value for field, value in event.item.items() if field in visible_fields or field == "pk"} if event.item is not None else None
+				data = json.dumps({"type": event.type, "pk": event.pk, "item": item}, default=encoder.default)
+				yield f"event: {event.type}\ndata: {data}\n\n"
+
+		response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+		response["Cache-Control"] = "no-cache"
+		# don't let nginx buffer the events
+		response["X-Accel-Buffering"] = "no"
+		return response
+
+	return change_feed_view
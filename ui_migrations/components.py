@@ -1,13 +1,16 @@
 from abc import ABC
-from typing import Literal, OrderedDict, Any
+from types import MappingProxyType
+from typing import Literal, OrderedDict, Any, Mapping, NoReturn
 from typing_extensions import TypedDict, NotRequired
 import dataclasses
 
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
 from django.db import models
 from django.template.loader import render_to_string
 
 from .ui_frameworks import UiFramework
 from .actions import Action
+from .change_feed import is_change_feed_enabled
 
 
 SerializedComponent = str
@@ -54,19 +57,117 @@ class ActionOptions:
 	actions: list[Action]
 
 
+@dataclasses.dataclass(frozen=True, slots=True)
+class ComponentSpec:
+	"""Metadata of a component class, compiled and validated once when the class is declared and shared by all its instances."""
+	model: type[models.Model]
+	"""The class of the corresponding Django model"""
+	field_names: tuple[str, ...]
+	"""Names of the fields shown in the component"""
+	fields_choices: Mapping[str, tuple]
+	"""Choices of the fields that have choices"""
+	fields_input_types: Mapping[str, str]
+	"""Type of the input element for each field"""
+	sortable_fields: frozenset[str]
+	"""Names of the fields that can be sorted by"""
+	filterable_lookups: Mapping[str, frozenset[str]]
+	"""Allowed lookup types of the fields that can be filtered by"""
+
+	@classmethod
+	def compile(cls, component_class: type["UiComponent"]) -> "ComponentSpec":
+		"""Compile the metadata of the `component_class` and validate its fields, roles and actions."""
+		model: type[models.Model] = component_class.model # type: ignore
+		fields_options = getattr(component_class, "fields_options")
+		def fail(message: str) -> NoReturn:
+			raise ImproperlyConfigured(f"Component '{component_class.__qualname__}': {message}")
+		def get_field(model: type[models.Model], field_name: str) -> models.Field:
+			try:
+				return model._meta.get_field(field_name) # type: ignore
+			except FieldDoesNotExist:
+				fail(f"Model '{model.__name__}' has no field '{field_name}'.")
+		def validate_roles(roles, name: str, allow_all: bool = False) -> None:
+			# a single string would be treated as a list of single character roles
+			if not (allow_all and roles == True) and (isinstance(roles, str) or not all(isinstance(role, str) for role in roles)):
+				fail(f"'{name}' must be a list of role names{' or True' if allow_all else ''}.")
+
+		validate_roles(getattr(component_class, "addable_by_roles", []), "addable_by_roles")
+		validate_roles(getattr(component_class, "removable_by_roles", []), "removable_by_roles")
+		row_height = getattr(component_class, "virtual_row_height", None)
+		if row_height is not None and (not isinstance(row_height, int) or row_height <= 0):
+			fail("'virtual_row_height' must be a positive number of pixels or None.")
+		fields_choices: dict[str, tuple] = {}
+		fields_input_types: dict[str, str] = {}
+		filterable_lookups: dict[str, frozenset[str]] = {}
+		for field_options in fields_options:
+			field = get_field(model, field_options.field_name)
+			validate_roles(field_options.modifiable_by_roles, f"{field_options.field_name}.modifiable_by_roles")
+			validate_roles(field_options.visible_by_roles, f"{field_options.field_name}.visible_by_roles", allow_all=True)
+			# nested fields (of DataEntry) belong to the related model
+			for subfield_options in getattr(field_options, "fields_options", []):
+				if field.related_model is None:
+					fail(f"Field '{field_options.field_name}' has nested fields, but is no relation.")
+				get_field(field.related_model, subfield_options.field_name) # type: ignore
+			# the metadata is keyed like the options, which may name the field by its attribute name (e.g. `customer_id`)
+			if choices := getattr(field, "choices", None):
+				fields_choices[field_options.field_name] = tuple(choice[0] for choice in choices)
+			fields_input_types[field_options.field_name] = get_field_input_type(field.get_internal_type(), fields_choices.get(field_options.field_name)) # type: ignore
+			if getattr(field_options, "sortable", False) and (not field.concrete or field.many_to_many):
+				fail(f"Field '{field_options.field_name}' can't be sorted by, since it has no column.")
+			if getattr(field_options, "filterable", False):
+				for lookup in field_options.filter_lookups:
+					if field.get_lookup(lookup) is None:
+						fail(f"Field '{field_options.field_name}' doesn't support the lookup '{lookup}'.")
+				filterable_lookups[field_options.field_name] = frozenset(field_options.filter_lookups)
+		for action_options in getattr(component_class, "actions_options", []):
+			validate_roles(action_options.roles, f"{action_options.display_name}.roles")
+			for action in action_options.actions:
+				if hasattr(action, "field_name"):
+					get_field(model, action.field_name)
+				try:
+					# server side actions are compiled to an update expression, which checks them against the model
+					action.get_update(model)
+				except ImproperlyConfigured as e:
+					fail(str(e))
+
+		return cls(
+			model=model,
+			field_names=tuple(field_options.field_name for field_options in fields_options),
+			fields_choices=MappingProxyType(fields_choices),
+			fields_input_types=MappingProxyType(fields_input_types),
+			sortable_fields=frozenset(field_options.field_name for field_options in fields_options if getattr(field_options, "sortable", False)),
+			filterable_lookups=MappingProxyType(filterable_lookups),
+		)
+
+
 class UiComponent(ABC):
 	"""Abstract base class for any UI Component"""
 	model: type[models.Model] | None
 	"""The class of the corresponding Django model"""
 	styling: bool = True
 	"""Wether to generate basic styling for this component"""
+	spec: ComponentSpec | None = None
+	"""Metadata of the component class, compiled when a subclass declaring a `model` and `fields_options` is created"""
+	def __init_subclass__(cls, **kwargs) -> None:
+		super().__init_subclass__(**kwargs)
+		# Base classes without a model or fields (like `DataTable` itself) have nothing to compile
+		if getattr(cls, "model", None) is not None and hasattr(cls, "fields_options"):
+			cls.spec = ComponentSpec.compile(cls)
 	def __init__(self, name: str | None = None, *, ui_framework: UiFramework):
 		"""Initialize this component with a `name`, which is used as the concrete component name in the UI framework, and the `ui_framework` that this component should be generated for."""
 		self.name = name or self.__class__.__name__
 		self.ui_framework = ui_framework
+	def get_file_path(self, path: str) -> str:
+		"""Get the path of the file that this component is generated to in the frontend at `path`."""
+		return f"{path}/src/components/{self.name}.vue"
+	def get_template_name(self) -> str:
+		"""Get the name of the template that this component is generated with."""
+		...
+	def get_template_context(self) -> dict[str, Any]:
+		"""Get the properties that are passed to the template."""
+		...
 	def generate(self) -> SerializedComponent:
 		"""Generate the component."""
-		...
+		return render_to_string(self.get_template_name(), self.get_template_context(), using="jinja2")
 
 class DataTable(UiComponent):
 	"""Component type `DataTable`. Inherit from this class for declaring a table component."""
@@ -76,6 +177,15 @@ class DataTable(UiComponent):
 	max_items_per_page: int = 100
 	"""How many items to show per table page (for pagination)"""
 
+	pagination: Literal["pages", "cursor"] = "pages"
+	"""How to paginate the items: `pages` uses page numbers and counts all items, `cursor` pages from item to item on the sort field (faster for large tables, but without a total page count)"""
+
+	export_format: Literal["csv", "ndjson"] | None = None
+	"""Format of the file that all items are exported to with an export button (or `None` for no export button)"""
+
+	virtual_row_height: int | None = None
+	"""Height of the rows in pixels for virtual scrolling, which only renders the rows in view and prefetches the next page (for a large `max_items_per_page`), or `None` to render all rows"""
+
 	addable_by_roles: list[str] = []
 	"""Which roles are allowed to create new items in this component"""
 
@@ -93,6 +203,10 @@ class DataTable(UiComponent):
 		"""Link that should be opened when the field is clicked, use `{field_name}` to dynamically insert the item's value at the field"""
 		sortable: bool = False
 		"""Wether one can sort by this field"""
+		filterable: bool = False
+		"""Wether items can be filtered by this field (with the lookups in `filter_lookups`)"""
+		filter_lookups: list[str] = dataclasses.field(default_factory=lambda: ["exact"])
+		"""Which lookup types are allowed for filtering by this field (for example `exact`, `icontains` or `gte`)"""
 		modifiable_by_roles: list[str] = dataclasses.field(default_factory=list)
 		"""Which roles are allowed to modify this fields's contents"""
 		visible_by_roles: list[str] | Literal[True] = True
@@ -108,38 +222,39 @@ class DataTable(UiComponent):
 	actions_options: list[ActionOptions] = []
 	"""Actions that can be performed on the items of the DataTable."""
 
-	def __init__(self, name: str | None = None, *, ui_framework: UiFramework):
-		super().__init__(name, ui_framework=ui_framework)
-		
-		# Get the choices for the fields from the model to make them passable to the template
-		self.fields_choices: dict[str, list] = {}
-		for field_name in (field_options.field_name for field_options in self.fields_options):
-			if choices := getattr(self.model._meta.get_field(field_name), "choices", None):
-				self.fields_choices[field_name] = [choice[0] for choice in choices] # type: ignore
-		
-		# Get the input types for the fields from the model (for different kinds of html input elements) to make them passable to the template
-		self.fields_input_types: dict[str, str] = {}
-		for field_name in (field_options.field_name for field_options in self.fields_options):
-			self.fields_input_types[field_name] = get_field_input_type(self.model._meta.get_field(field_name).get_internal_type(), self.fields_choices.get(field_name))
-
-	def generate(self) -> SerializedComponent:
+	def get_template_name(self) -> str:
 		match self.ui_framework:
 			case UiFramework.VUE:
-				# Pass properties to the Jinja 2 template
-				return render_to_string("vue/DataTable.html.j2", {
-					"fields_options": self.fields_options,
-					"model_name": self.model.__name__.lower(),
-					"addable_by_roles": self.addable_by_roles,
-					"removable_by_roles": self.removable_by_roles,
-					"max_items_per_page": self.max_items_per_page,
-					"actions_options": self.actions_options,
-					"fields_choices": self.fields_choices,
-					"fields_input_types": self.fields_input_types,
-					"styling": self.styling,
-				}, using="jinja2")
+				return "vue/DataTable.html.j2"
 			case f:
 				raise NotImplementedError(f"UI Framework '{f}' is not yet supported.")
 
+	def get_template_context(self) -> dict[str, Any]:
+		# Pass properties to the Jinja 2 template
+		return {
+			"fields_options": self.fields_options,
+			"model_name": self.model.__name__.lower(),
+			"addable_by_roles": self.addable_by_roles,
+			"removable_by_roles": self.removable_by_roles,
+			"max_items_per_page": self.max_items_per_page,
+			"pagination": self.pagination,
+			"export_format": self.export_format,
+			"virtual_row_height": self.virtual_row_height,
+			"actions_options": self.actions_options,
+			"selection_roles": sorted({
+				role
+				for action_options in self.actions_options
+				if any(action._type != "open_url" for action in action_options.actions)
+				for role in action_options.roles
+			}),
+			"component_name": self.name,
+			# the choices are passed as lists, which are rendered as JavaScript arrays
+			"fields_choices": {field_name: list(choices) for field_name, choices in self.spec.fields_choices.items()}, # type: ignore
+			"fields_input_types": dict(self.spec.fields_input_types), # type: ignore
+			"change_feed": is_change_feed_enabled(),
+			"styling": self.styling,
+		}
+
 
 class DataEntry(UiComponent):
 	model: type[models.Model]
@@ -169,32 +284,47 @@ class DataEntry(UiComponent):
 	data_by_prop: str | None = None
 	"""The name of the prop that contains the data for the DataEntry. If None, data is fetched from within the component."""
  
-	def __init__(self, name: str | None = None, *, ui_framework: UiFramework):
-		super().__init__(name, ui_framework=ui_framework)
-		
-		# Get the choices for the fields from the model to make them passable to the template
-		self.fields_choices: dict[str, list] = {}
-		for field_name in (field_options.field_name for field_options in self.fields_options):
-			if choices := getattr(self.model._meta.get_field(field_name), "choices", None):
-				self.fields_choices[field_name] = [choice[0] for choice in choices] # type: ignore
-		
-		# Get the input types for the fields from the model (for different kinds of html input elements) to make them passable to the template
-		self.fields_input_types: dict[str, str] = {}
-		for field_name in (field_options.field_name for field_options in self.fields_options):
-			self.fields_input_types[field_name] = get_field_input_type(self.model._meta.get_field(field_name).get_internal_type(), self.fields_choices.get(field_name))
- 
-	def generate(self) -> SerializedComponent:
+	def get_template_name(self) -> str:
 		match self.ui_framework:
 			case UiFramework.VUE:
-				# Pass properties to the Jinja 2 template
-				return render_to_string("vue/DataEntry.html.j2", {
-					"fields_options": self.fields_options,
-					"model_name": self.model.__name__.lower(),
-					"actions_options": self.actions_options,
-					"fields_choices": self.fields_choices,
-					"fields_input_types": self.fields_input_types,
-					"data_by_prop": self.data_by_prop,
-					"styling": self.styling,
-				}, using="jinja2")
+				return "vue/DataEntry.html.j2"
 			case f:
 				raise NotImplementedError(f"UI Framework '{f}' is not yet supported.")
+
+	def get_template_context(self) -> dict[str, Any]:
+		# Pass properties to the Jinja 2 template
+		return {
+			"fields_options": self.fields_options,
+			"model_name": self.model.__name__.lower(),
+			"actions_options": self.actions_options,
+			# the choices are passed as lists, which are rendered as JavaScript arrays
+			"fields_choices": {field_name: list(choices) for field_name, choices in self.spec.fields_choices.items()}, # type: ignore
+			"fields_input_types": dict(self.spec.fields_input_types), # type: ignore
+			"data_by_prop": self.data_by_prop,
+			"change_feed": is_change_feed_enabled(),
+			"styling": self.styling,
+		}
+
+
+class ModelStore(UiComponent):
+	"""Client side store for the items of a model, which is shared by all generated components of the model in a frontend. Generated by `migrate_ui` for every model that has components."""
+
+	def __init__(self, model: type[models.Model], *, ui_framework: UiFramework):
+		super().__init__(f"{model.__name__.lower()}Store", ui_framework=ui_framework)
+		self.model = model
+
+	def get_file_path(self, path: str) -> str:
+		return f"{path}/src/stores/{self.name}.ts"
+
+	def get_template_name(self) -> str:
+		match self.ui_framework:
+			case UiFramework.VUE:
+				return "vue/ModelStore.ts.j2"
+			case f:
+				raise NotImplementedError(f"UI Framework '{f}' is not yet supported.")
+
+	def get_template_context(self) -> dict[str, Any]:
+		return {
+			"model_name": self.model.__name__.lower(),
+			"change_feed": is_change_feed_enabled(),
+		}
@@ -0,0 +1,39 @@
+import csv
+import itertools
+import json
+from typing import Iterator
+
+from django.db import models
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+
+def iterate_serialized(query_set: models.QuerySet, Serializer: type[serializers.ModelSerializer], chunk_size: int) -> Iterator[dict]:
+	"""Iterate over the serialized items of the `query_set`, loading and serializing only `chunk_size` items at a time."""
+	items = query_set.iterator(chunk_size=chunk_size)
+	while chunk := list(itertools.islice(items, chunk_size)):
+		yield from Serializer(chunk, many=True).data
+
+
+def stream_ndjson(query_set: models.QuerySet, Serializer: type[serializers.ModelSerializer], chunk_size: int) -> Iterator[bytes]:
+	"""Stream the serialized items of the `query_set` as newline delimited JSON."""
+	renderer = JSONRenderer()
+	for item in iterate_serialized(query_set, Serializer, chunk_size):
+		yield renderer.render(item) + b"\n"
+
+
+class _Echo:
+	"""File-like object that returns the written value instead of storing it, for streaming with `csv.writer`."""
+	def write(self, value: str) -> str:
+		return value
+
+
+def stream_csv(query_set: models.QuerySet, Serializer: type[serializers.ModelSerializer], columns: list[str], chunk_size: int) -> Iterator[str]:
+	"""Stream the serialized items of the `query_set` as CSV with the given `columns`. Nested data is written as JSON."""
+	writer = csv.writer(_Echo())
+	yield writer.writerow(columns)
+	for item in iterate_serialized(query_set, Serializer, chunk_size):
+		yield writer.writerow(
+			json.dumps(value) if isinstance(value, (dict, list)) else ("" if value is None else value)
+			for value in (item.get(column) for column in columns)
+		)
@@ -0,0 +1,258 @@
+import bisect
+import contextvars
+import dataclasses
+import functools
+import threading
+import time
+from contextlib import ExitStack
+from typing import Callable, Iterator
+
+from asgiref.sync import sync_to_async, iscoroutinefunction
+from django.conf import settings
+from django.db import connections, models
+from django.http import HttpRequest, HttpResponse, HttpResponseBase, StreamingHttpResponse
+from django.utils.module_loading import import_string
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Upper bounds of the histogram buckets for durations in seconds"""
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+"""Upper bounds of the histogram buckets for numbers of database queries"""
+
+ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+"""Upper bounds of the histogram buckets for numbers of serialized rows"""
+
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+"""Upper bounds of the histogram buckets for response sizes in bytes"""
+
+
+@dataclasses.dataclass
+class EndpointMetrics:
+	"""Measurements of a single request to a generated endpoint."""
+	model: str
+	"""Label of the model, e.g. `shop.Order`"""
+	method: str
+	"""HTTP method of the request"""
+	endpoint: str
+	"""Kind of the endpoint: `item`, `items`, `export`, `bulk` or `action`"""
+	fields: str
+	"""Requested fields (the `_fields` query parameter)"""
+	status_code: int
+	duration: float
+	"""Wall time of the request in seconds, including rendering (and streaming) the response"""
+	query_count: int
+	"""Number of database queries"""
+	query_duration: float
+	"""Time spent in database queries in seconds"""
+	rows: int
+	"""Number of serialized items (lines of streamed exports)"""
+	response_size: int
+	"""Size of the response body in bytes"""
+
+
+class Histogram:
+	"""Histogram with fixed buckets, in the format of Prometheus."""
+
+	def __init__(self, buckets: tuple[float, ...]):
+		self.buckets = buckets
+		self.counts = [0] * (len(buckets) + 1)
+		self.sum = 0.0
+
+	def observe(self, value: float) -> None:
+		# the last count is for values greater than all buckets (`+Inf`)
+		self.counts[bisect.bisect_left(self.buckets, value)] += 1
+		self.sum += value
+
+
+class MetricsRegistry:
+	"""Process-local histograms of the measurements of the generated endpoints, labeled by model, HTTP method and endpoint kind."""
+
+	METRICS: dict[str, tuple[str, tuple[float, ...], Callable[[EndpointMetrics], float]]] = {
+		"ui_migrations_request_duration_seconds": ("Wall time of the requests.", DURATION_BUCKETS, lambda metrics: metrics.duration),
+		"ui_migrations_request_queries": ("Number of database queries per request.", QUERY_COUNT_BUCKETS, lambda metrics: metrics.query_count),
+		"ui_migrations_request_query_duration_seconds": ("Time spent in database queries per request.", DURATION_BUCKETS, lambda metrics: metrics.query_duration),
+		"ui_migrations_response_rows": ("Number of serialized items per response.", ROWS_BUCKETS, lambda metrics: metrics.rows),
+		"ui_migrations_response_size_bytes": ("Size of the response bodies.", SIZE_BUCKETS, lambda metrics: metrics.response_size),
+	}
+	"""Names of the metrics with their description, buckets and the measurement they observe"""
+
+	def __init__(self):
+		self._histograms: dict[tuple[str, tuple[str, str, str]], Histogram] = {}
+		self._lock = threading.Lock()
+
+	def record(self, metrics: EndpointMetrics) -> None:
+		"""Add the measurements of a request to the histograms."""
+		labels = (metrics.model, metrics.method, metrics.endpoint)
+		with self._lock:
+			for name, (_, buckets, get_value) in self.METRICS.items():
+				if (histogram := self._histograms.get((name, labels))) is None:
+					histogram = self._histograms[(name, labels)] = Histogram(buckets)
+				histogram.observe(get_value(metrics))
+
+	def render(self) -> str:
+		"""Render all histograms in the Prometheus text format."""
+		lines: list[str] = []
+		with self._lock:
+			for name, (description, buckets, _) in self.METRICS.items():
+				lines.append(f"# HELP {name} {description}")
+				lines.append(f"# TYPE {name} histogram")
+				for (histogram_name, (model, method, endpoint)), histogram in sorted(self._histograms.items()):
+					if histogram_name != name:
+						continue
+					labels = f'model="{model}",method="{method}",endpoint="{endpoint}"'
+					cumulative_count = 0
+					for bucket, count in zip((*buckets, "+Inf"), histogram.counts):
+						cumulative_count += count
+						lines.append(f'{name}_bucket{{{labels},le="{bucket}"}} {cumulative_count}')
+					lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+					lines.append(f"{name}_count{{{labels}}} {cumulative_count}")
+		return "\n".join(lines) + "\n"
+
+	def clear(self) -> None:
+		"""Remove all measurements."""
+		with self._lock:
+			self._histograms.clear()
+
+
+metrics_registry = MetricsRegistry()
+
+
+def is_instrumentation_enabled() -> bool:
+	"""Check if the generated endpoints are instrumented, as configured by the `UI_MIGRATIONS_INSTRUMENTATION` setting."""
+	return getattr(settings, "UI_MIGRATIONS_INSTRUMENTATION", False)
+
+
+def get_instrumentation_hook() -> Callable[[EndpointMetrics], None] | None:
+	"""Get the function that the measurements of every request are passed to, as configured by the `UI_MIGRATIONS_INSTRUMENTATION_HOOK` setting (a function or its dotted path)."""
+	hook = getattr(settings, "UI_MIGRATIONS_INSTRUMENTATION_HOOK", None)
+	return import_string(hook) if isinstance(hook, str) else hook
+
+
+class _QueryCounter:
+	"""Database execute wrapper that counts the queries and the time spent in them."""
+	def __init__(self):
+		self.count = 0
+		self.duration = 0.0
+
+	def __call__(self, execute, sql, params, many, context):
+		start = time.perf_counter()
+		try:
+			return execute(sql, params, many, context)
+		finally:
+			self.duration += time.perf_counter() - start
+			self.count += 1
+
+
+_request_query_counter: contextvars.ContextVar[_QueryCounter | None] = contextvars.ContextVar("ui_migrations_request_query_counter", default=None)
+"""Query counter of the async request that is handled in the current context, so that overlapping requests count their queries separately"""
+
+
+def _count_request_query(execute, sql, params, many, context):
+	"""Database execute wrapper that counts the query with the counter of the request in the current context (if any)."""
+	if (counter := _request_query_counter.get()) is None:
+		return execute(sql, params, many, context)
+	return counter(execute, sql, params, many, context)
+
+
+def count_rows(response: HttpResponseBase) -> int:
+	"""Count the items serialized in the data of a response of the generated endpoints."""
+	data = getattr(response, "data", None)
+	if not isinstance(data, dict):
+		return 0
+	if isinstance(data.get("items"), list):
+		return len(data["items"])
+	if isinstance(data.get("created"), list) or isinstance(data.get("updated"), list):
+		return len(data.get("created", [])) + len(data.get("updated", []))
+	return 1 if "pk" in data else 0
+
+
+def instrument(view: Callable[..., HttpResponseBase], model: type[models.Model], endpoint: str) -> Callable[..., HttpResponseBase]:
+	"""
+	Wrap a generated `view` of the `model` to record its measurements in the `metrics_registry` and pass them to the instrumentation hook.
+	Returns the view unchanged if the instrumentation is disabled, so that it has no overhead.
+	"""
+	if not is_instrumentation_enabled():
+		return view
+	hook = get_instrumentation_hook()
+
+	def record(request: HttpRequest, start: float, counter: _QueryCounter, response: HttpResponseBase, rows: int, response_size: int) -> None:
+		metrics = EndpointMetrics(
+			model=model._meta.label,
+			method=request.method or "",
+			endpoint=endpoint,
+			fields=request.GET.get("_fields", ""),
+			status_code=response.status_code,
+			duration=time.perf_counter() - start,
+			query_count=counter.count,
+			query_duration=counter.duration,
+			rows=rows,
+			response_size=response_size,
+		)
+		metrics_registry.record(metrics)
+		if hook is not None:
+			hook(metrics)
+
+	if iscoroutinefunction(view):
+		# the queries of async views run in the thread shared by the `sync_to_async` calls, which run them in a copy of the context of the request,
+		# so a single wrapper on the connections of that thread counts them with the counter of their request
+		def add_wrapper() -> None:
+			for connection in connections.all():
+				if _count_request_query not in connection.execute_wrappers:
+					connection.execute_wrappers.append(_count_request_query)
+
+		@functools.wraps(view)
+		async def instrumented_async_view(request: HttpRequest, *args, **kwargs) -> HttpResponseBase:
+			start = time.perf_counter()
+			counter = _QueryCounter()
+			await sync_to_async(add_wrapper)()
+			token = _request_query_counter.set(counter)
+			try:
+				response = await view(request, *args, **kwargs)
+			finally:
+				_request_query_counter.reset(token)
+			record(request, start, counter, response, count_rows(response), len(getattr(response, "content", b"")))
+			return response
+
+		return instrumented_async_view
+
+	@functools.wraps(view)
+	def instrumented_view(request: HttpRequest, *args, **kwargs) -> HttpResponseBase:
+		start = time.perf_counter()
+		counter = _QueryCounter()
+
+		with ExitStack() as stack:
+			for connection in connections.all():
+				stack.enter_context(connection.execute_wrapper(counter))
+			response = view(request, *args, **kwargs)
+			# render the response now (instead of in the request handler), so that rendering is measured as well
+			if callable(getattr(response, "render", None)):
+				response = response.render() # type: ignore
+
+		if isinstance(response, StreamingHttpResponse):
+			# streamed responses query and serialize the items while streaming, so they are measured until the end of the stream
+			content: Iterator[bytes] = response.streaming_content # type: ignore
+			def measure_stream() -> Iterator[bytes]:
+				lines = 0
+				size = 0
+				try:
+					with ExitStack() as stack:
+						for connection in connections.all():
+							stack.enter_context(connection.execute_wrapper(counter))
+						for chunk in content:
+							lines += 1
+							size += len(chunk)
+							yield chunk
+				finally:
+					record(request, start, counter, response, lines, size)
+			response.streaming_content = measure_stream()
+		else:
+			record(request, start, counter, response, count_rows(response), len(getattr(response, "content", b"")))
+		return response
+
+	return instrumented_view
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+	"""Expose the measurements of the generated endpoints in the Prometheus text format."""
+	return HttpResponse(metrics_registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
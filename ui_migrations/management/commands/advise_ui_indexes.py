@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand
+from django.db import models, migrations, connection
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+
+from ...utils import get_components_from_all_apps
+
+
+class Command(BaseCommand):
+	help = 'Lists the sortable and filterable fields of the UI components that have no supporting database index.'
+
+	def add_arguments(self, parser) -> None:
+		parser.add_argument(
+			"--write-migrations",
+			action="store_true",
+			help="Write a migration for every app that adds the missing indexes to the database.",
+		)
+
+	def handle(self, *args, **options) -> None:
+		# collect the fields that are sorted or filtered by, with the reasons
+		fields_usages: dict[tuple[type[models.Model], str], set[str]] = {}
+		for component, _ in get_components_from_all_apps():
+			if component.spec is None:
+				continue
+			for field_name in component.spec.sortable_fields:
+				fields_usages.setdefault((component.spec.model, field_name), set()).add("sortable")
+			for field_name in component.spec.filterable_lookups:
+				fields_usages.setdefault((component.spec.model, field_name), set()).add("filterable")
+
+		missing_indexes: dict[str, list[tuple[type[models.Model], models.Field]]] = {}
+		for (model, field_name), usages in sorted(fields_usages.items(), key=lambda item: (item[0][0]._meta.label, item[0][1])):
+			field = model._meta.get_field(field_name)
+			if not field.concrete or field.many_to_many or has_index(model, field): # type: ignore
+				continue
+			self.stdout.write(f"{model._meta.label}.{field_name} ({', '.join(sorted(usages))}) has no index.")
+			missing_indexes.setdefault(model._meta.app_label, []).append((model, field)) # type: ignore
+
+		if not missing_indexes:
+			self.stdout.write(self.style.SUCCESS("All sortable and filterable fields have an index."))
+			return
+		if options["write_migrations"]:
+			for app_label, models_and_fields in missing_indexes.items():
+				path = write_index_migration(app_label, models_and_fields)
+				self.stdout.write(self.style.SUCCESS(f"Wrote migration '{path}'."))
+
+
+def has_index(model: type[models.Model], field: models.Field) -> bool:
+	"""Check if the `field` is the first field of any index of the `model` (so that the database can use the index for sorting and filtering by the field)."""
+	if field.primary_key or field.unique or field.db_index:
+		return True
+	for index in model._meta.indexes:
+		if index.fields and index.fields[0].lstrip("-") == field.name:
+			return True
+	for constraint in model._meta.constraints:
+		if isinstance(constraint, models.UniqueConstraint) and constraint.fields and constraint.fields[0] == field.name:
+			return True
+	for fields in (*model._meta.unique_together, *getattr(model._meta, "index_together", ())):
+		if fields and fields[0] == field.name:
+			return True
+	# indexes that only exist in the database (e.g. added by a migration written by this command)
+	with connection.cursor() as cursor:
+		constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+	return any(
+		constraint["columns"] and constraint["columns"][0] == field.column and (constraint["index"] or constraint["unique"] or constraint["primary_key"])
+		for constraint in constraints.values()
+	)
+
+
+def write_index_migration(app_label: str, models_and_fields: list[tuple[type[models.Model], models.Field]]) -> str:
+	"""Write a migration for the app with `app_label` that adds an index for each of the fields and return its path."""
+	loader = MigrationLoader(None, ignore_no_migrations=True)
+	leaf_nodes = loader.graph.leaf_nodes(app_label)
+	number = max((int(name.split("_")[0]) for _, name in leaf_nodes if name.split("_")[0].isdigit()), default=0) + 1
+
+	index_operations = []
+	for model, field in models_and_fields:
+		index = models.Index(fields=[field.name])
+		index.set_name_with_model(model)
+		index_operations.append(migrations.AddIndex(model_name=model._meta.model_name, index=index)) # type: ignore
+
+	migration = migrations.Migration(f"{number:04d}_ui_migrations_indexes", app_label)
+	migration.dependencies = list(leaf_nodes)
+	# the indexes are not declared on the models, so they are only added to the database and not to the migration state
+	# (otherwise `makemigrations` would remove them again)
+	migration.operations = [migrations.SeparateDatabaseAndState(database_operations=index_operations)]
+	writer = MigrationWriter(migration)
+	with open(writer.path, "w") as f:
+		f.write(writer.as_string())
+	return writer.path
@@ -1,56 +1,366 @@
-from django.core.management.base import BaseCommand
-import re
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.utils import autoreload
+from typing import Literal
+import concurrent.futures
+import dataclasses
+import multiprocessing
+import importlib
+import hashlib
+import json
+import time
+import sys
+import os
 
-from ...utils import get_components_from_all_apps
+from ...utils import get_components_from_all_apps, get_components_from_module
 from ...ui_frameworks import UiFramework
+from ...components import UiComponent, ModelStore
+from ...batching import BatchLoader
+from ...safe_regions import merge_safe_regions
+from ...watching import get_file_watcher
+from ...access_manifest import get_models_access, write_access_manifest
 
 
-SAFE_REGION_PATTERN = re.compile(
-	r"(\/\* SAFE REGION BEGIN \*\/(.*?)\/\* SAFE REGION END \*\/)|(<!-- SAFE REGION BEGIN -->(.*?)<!-- SAFE REGION END -->)",
-	re.DOTALL
-)
-"""RegEx pattern for matching safe regions"""
+MANIFEST_FILE_NAME = ".ui_migrations_manifest.json"
+"""Name of the manifest file in each frontend path, that records the hashes of the generated components"""
+
+
+@dataclasses.dataclass
+class ComponentMigration:
+	"""Result of migrating a single component."""
+	file_path: str
+	status: Literal["generated", "skipped", "unchanged"] | None = None
+	"""Wether the file was written, skipped without rendering, or rendered without changes (`None` if the migration failed)"""
+	manifest_entry: dict[str, str] | None = None
+	"""Hashes of the component to record in the manifest"""
+	error: Exception | None = None
+	removed_safe_regions: list[str] = dataclasses.field(default_factory=list)
+	"""Names of safe regions with content that don't exist in the newly generated component anymore"""
+
+
+_pending_migrations: list[tuple[UiComponent, str, dict[str, str] | None, bool]] = []
+"""Components with their frontend path, their manifest entry and wether to force regeneration, for the workers to migrate by index (inherited by forked processes)"""
+
+
+def _migrate_pending(index: int) -> ComponentMigration:
+	"""Migrate the pending component at `index`."""
+	return migrate_component(*_pending_migrations[index])
 
 
 class Command(BaseCommand):
 	help = 'Migrates the UI components to the frontend.'
 
+	def add_arguments(self, parser) -> None:
+		parser.add_argument(
+			"--force",
+			action="store_true",
+			help="Regenerate all components, even if neither their declaration nor their template has changed.",
+		)
+		parser.add_argument(
+			"--jobs", "-j",
+			type=int,
+			default=1,
+			help="Number of worker processes (or threads where processes can't be forked) that render and merge the components in parallel.",
+		)
+		parser.add_argument(
+			"--watch",
+			action="store_true",
+			help="Keep running and migrate the affected components whenever a `ui_components` module, a model or a template changes.",
+		)
+		parser.add_argument(
+			"--debounce",
+			type=float,
+			default=0.05,
+			help="Seconds to wait for further changes before migrating in watch mode.",
+		)
+		parser.add_argument(
+			"--polling",
+			action="store_true",
+			help="Watch the files by polling instead of with inotify.",
+		)
+
 	def handle(self, *args, **options) -> None:
-		for component, path in get_components_from_all_apps():
-			# Generate all components
-			component_code = component.generate()
-			match component.ui_framework:
-				case UiFramework.VUE:
+		components_and_paths = list(get_components_from_all_apps())
+		migrations = self.migrate(components_and_paths + get_model_stores(components_and_paths), options["force"], options["jobs"])
+		self.write_access_manifest(components_and_paths)
+		self.report(migrations)
+		if options["watch"]:
+			self.watch(components_and_paths, options["jobs"], options["debounce"], options["polling"])
+			return
+		# the other components are migrated and reported anyway, so that one broken component doesn't hide the errors of the others
+		if failed_file_paths := [migration.file_path for migration in migrations if migration.error is not None]:
+			raise CommandError(f"Failed to migrate {', '.join(repr(file_path) for file_path in failed_file_paths)}.")
+
+	def migrate(self, components_and_paths: list[tuple[UiComponent, str]], force: bool, jobs: int) -> list[ComponentMigration]:
+		"""Migrate the components to their frontends, update the manifests and write which files were generated."""
+		# Sort the components, so that the output and the reported errors don't depend on the order of the set
+		components_and_paths = sorted(components_and_paths, key=lambda component_and_path: (component_and_path[1], component_and_path[0].name))
+		for component, _ in components_and_paths:
+			if component.ui_framework != UiFramework.VUE:
+				raise NotImplementedError(f"UI Framework '{component.ui_framework}' is not yet supported.")
+
+		manifests: dict[str, dict[str, dict[str, str]]] = {}
+		for _, path in components_and_paths:
+			if path not in manifests:
+				manifests[path] = load_manifest(path)
+		_pending_migrations[:] = [
+			(component, path, manifests[path].get(component.name), force)
+			for component, path in components_and_paths
+		]
+
+		try:
+			jobs = max(1, min(jobs, len(_pending_migrations)))
+			if jobs == 1:
+				migrations = [_migrate_pending(index) for index in range(len(_pending_migrations))]
+			else:
+				# Compile the templates once before starting the workers, so that they share the compiled templates
+				environment = engines["jinja2"].env # type: ignore
+				for component, _, _, _ in _pending_migrations:
+					environment.get_template(component.get_template_name())
+				if "fork" in multiprocessing.get_all_start_methods():
+					executor = concurrent.futures.ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context("fork"))
+				else:
+					executor = concurrent.futures.ThreadPoolExecutor(jobs)
+				with executor:
+					migrations = list(executor.map(_migrate_pending, range(len(_pending_migrations))))
+		finally:
+			_pending_migrations.clear()
+
+		# Update the manifests with the successfully migrated components
+		for (component, path), migration in zip(components_and_paths, migrations):
+			if migration.manifest_entry is not None:
+				manifests[path][component.name] = migration.manifest_entry
+		for path, manifest in manifests.items():
+			save_manifest(path, manifest)
+
+		for migration in migrations:
+			if migration.status == "generated":
+				self.stdout.write(f"Generated '{migration.file_path}'.")
+			if migration.removed_safe_regions:
+				self.stderr.write(self.style.WARNING(
+					f"Removed the safe regions {', '.join(repr(name) for name in migration.removed_safe_regions)} with custom code from '{migration.file_path}', "
+					f"the previous file is kept in '{migration.file_path}.bak'."
+				))
+		return migrations
+
+	def write_access_manifest(self, components_and_paths: list[tuple[UiComponent, str]]) -> None:
+		"""Write the access manifest, so that the URLs can be configured without inspecting all components."""
+		if (manifest_path := write_access_manifest(get_models_access(component for component, _ in components_and_paths))) is not None:
+			self.stdout.write(f"Wrote the access manifest '{manifest_path}'.")
+
+	def report(self, migrations: list[ComponentMigration]) -> None:
+		"""Write the errors and the number of generated, skipped and unchanged components."""
+		for migration in migrations:
+			if migration.error is not None:
+				self.stderr.write(self.style.ERROR(f"Failed to migrate '{migration.file_path}': {migration.error}"))
+		self.stdout.write(self.style.SUCCESS(
+			f"{sum(migration.status == 'generated' for migration in migrations)} generated, "
+			f"{sum(migration.status == 'skipped' for migration in migrations)} skipped, "
+			f"{sum(migration.status == 'unchanged' for migration in migrations)} unchanged."
+		))
+
+	def watch(self, components_and_paths: list[tuple[UiComponent, str]], jobs: int, debounce: float, polling: bool) -> None:
+		"""Watch the files that the components are generated from and migrate the affected components whenever they change."""
+		components: dict[tuple[str, str], tuple[UiComponent, str]] = {
+			(path, component.name): (component, path) for component, path in components_and_paths + get_model_stores(components_and_paths)
+		}
+		dependencies = {key: get_component_dependencies(component) for key, (component, _) in components.items()}
+		watched_file_paths = get_watched_file_paths(dependencies)
+		watcher = get_file_watcher(watched_file_paths, polling)
+		self.stdout.write(f"Watching {len(watched_file_paths)} files for changes with {watcher.__class__.__name__}, press CTRL-C to stop.")
+		try:
+			while True:
+				changed_file_paths = watcher.wait(debounce)
+				start = time.perf_counter()
+
+				# Models can't be reloaded by Django, so the whole process is restarted (unchanged components are skipped by the manifest)
+				if any(dependency.model_file_path in changed_file_paths for dependency in dependencies.values()):
+					self.stdout.write("A model changed, restarting.")
+					watcher.close()
+					os.execv(sys.executable, autoreload.get_child_arguments())
+
+				affected_keys: set[tuple[str, str]] = set()
+				# Reload the changed `ui_components` modules and replace their components
+				for module_name in {dependency.module_name for dependency in dependencies.values() if dependency.module_file_path in changed_file_paths}:
 					try:
-						with open(f"{path}/src/components/{component.name}.vue", "r") as f:
-							old_component_code: str = f.read()
-							component_existed = True
-					except FileNotFoundError:
-						component_existed = False
-					with open(f"{path}/src/components/{component.name}.vue", "w") as f:
-						if component_existed:
-							try:
-								# If the same component has been generated before, take the safe regions from the already existing components
-								component_code = replace_safe_regions(component_code, old_component_code, SAFE_REGION_PATTERN)
-							except ValueError as e:
-								if component_existed:
-									f.write(old_component_code)
-								raise ValueError(f"Failed to merge safe regions in '{component.name}.vue': {e}")
-						f.write(component_code)
-				case _:
-					raise NotImplementedError(f"UI Framework '{component.ui_framework}' is not yet supported.")
-
-
-def replace_safe_regions(new_component_code: str, old_component_code: str, safe_region_pattern: re.Pattern):
-	"""
-	Replaces all safe regions in the new component code with the safe regions from the old component code.
-	"""
-	old_safe_regions = list(match.group() for match in safe_region_pattern.finditer(old_component_code))
-	new_safe_region_count = len(list(safe_region_pattern.finditer(new_component_code)))
-
-	if len(old_safe_regions) != new_safe_region_count:
-		raise ValueError("The newly generated component has a different number of safe regions than the existing component.")
-
-	old_safe_regions_iter = iter(old_safe_regions)
-
-	return safe_region_pattern.sub(lambda _: next(old_safe_regions_iter), new_component_code)
+						module = importlib.reload(sys.modules[module_name])
+						module_components = get_components_from_module(module)
+					except Exception as e:
+						self.stderr.write(self.style.ERROR(f"Failed to reload '{module_name}': {e}"))
+						continue
+					for key in [key for key, dependency in dependencies.items() if dependency.module_name == module_name]:
+						del components[key]
+						del dependencies[key]
+					for component, path in module_components:
+						components[(path, component.name)] = (component, path)
+						dependencies[(path, component.name)] = get_component_dependencies(component)
+						affected_keys.add((path, component.name))
+					# the reloaded components can have models without a store yet
+					for store, path in get_model_stores(get_declared_components(components)):
+						if (path, store.name) not in components:
+							components[(path, store.name)] = (store, path)
+							dependencies[(path, store.name)] = get_component_dependencies(store)
+							affected_keys.add((path, store.name))
+
+				# Templates are compiled again once they changed
+				if any(dependency.template_file_path in changed_file_paths for dependency in dependencies.values()):
+					environment = engines["jinja2"].env # type: ignore
+					if environment.cache is not None:
+						environment.cache.clear()
+					affected_keys |= {key for key, dependency in dependencies.items() if dependency.template_file_path in changed_file_paths}
+
+				if affected_keys:
+					migrations = self.migrate([components[key] for key in affected_keys], False, jobs)
+					# like the initial manifest, without the stores and batch loaders (which would add empty actions)
+					self.write_access_manifest(get_declared_components(components))
+					self.report(migrations)
+					self.stdout.write(f"Migrated {len(migrations)} components in {(time.perf_counter() - start) * 1000:.0f} ms.")
+
+				if (file_paths := get_watched_file_paths(dependencies)) != watched_file_paths:
+					watcher.close()
+					watched_file_paths = file_paths
+					watcher = get_file_watcher(watched_file_paths, polling)
+		except KeyboardInterrupt:
+			pass
+		finally:
+			watcher.close()
+
+
+def get_declared_components(components: dict[tuple[str, str], tuple[UiComponent, str]]) -> list[tuple[UiComponent, str]]:
+	"""Get the components that are declared in the `ui_components` modules, without the generated stores and batch loaders."""
+	return [(component, path) for component, path in components.values() if not isinstance(component, (ModelStore, BatchLoader))]
+
+
+def get_model_stores(components_and_paths: list[tuple[UiComponent, str]]) -> list[tuple[UiComponent, str]]:
+	"""Get a store for every model that has components in a frontend, which is shared by these components, and the batch loader shared by the stores of the frontend."""
+	models_and_paths = {
+		(component.model, component.ui_framework, path): None
+		for component, path in components_and_paths
+		if component.model is not None
+	}
+	stores: list[tuple[UiComponent, str]] = [(ModelStore(model, ui_framework=ui_framework), path) for model, ui_framework, path in models_and_paths]
+	for ui_framework, path in {(ui_framework, path): None for _, ui_framework, path in models_and_paths}:
+		stores.append((BatchLoader(ui_framework=ui_framework), path))
+	return stores
+
+
+@dataclasses.dataclass
+class ComponentDependencies:
+	"""Files that a component is generated from, for regenerating it in watch mode when they change."""
+	module_name: str
+	"""Name of the `ui_components` module that declares the component"""
+	module_file_path: str | None
+	"""Path of the `ui_components` module"""
+	model_file_path: str | None
+	"""Path of the module that declares the component's model"""
+	template_file_path: str | None
+	"""Path of the component's template"""
+
+
+def get_component_dependencies(component: UiComponent) -> ComponentDependencies:
+	"""Get the files that the `component` is generated from."""
+	def get_module_file_path(module_name: str) -> str | None:
+		file_path = getattr(sys.modules.get(module_name), "__file__", None)
+		return os.path.realpath(file_path) if file_path else None
+	environment = engines["jinja2"].env # type: ignore
+	_, template_file_path, _ = environment.loader.get_source(environment, component.get_template_name())
+	return ComponentDependencies(
+		module_name=component.__class__.__module__,
+		# stores are not declared in a module of the project, so there is nothing to reload for them
+		module_file_path=get_module_file_path(component.__class__.__module__) if not isinstance(component, (ModelStore, BatchLoader)) else None,
+		model_file_path=get_module_file_path(component.model.__module__) if component.model is not None else None,
+		template_file_path=os.path.realpath(template_file_path) if template_file_path else None,
+	)
+
+
+def get_watched_file_paths(dependencies: dict[tuple[str, str], ComponentDependencies]) -> set[str]:
+	"""Get the paths of all files that any of the components depend on."""
+	return {
+		file_path
+		for dependency in dependencies.values()
+		for file_path in (dependency.module_file_path, dependency.model_file_path, dependency.template_file_path)
+		if file_path is not None
+	}
+
+
+def migrate_component(component: UiComponent, path: str, manifest_entry: dict[str, str] | None, force: bool) -> ComponentMigration:
+	"""Generate the `component` in the frontend at `path` and merge the safe regions of the existing file, unless nothing changed since the `manifest_entry` was recorded."""
+	file_path = component.get_file_path(path)
+	try:
+		try:
+			with open(file_path, "r") as f:
+				old_component_code: str | None = f.read()
+		except FileNotFoundError:
+			old_component_code = None
+
+		# Skip the component if its inputs are the same as last time and the file has not been edited since
+		hashes = {"inputs": hash_inputs(component), "template": hash_template(component)}
+		if (
+			not force
+			and old_component_code is not None
+			and manifest_entry == {**hashes, "output": hash_text(old_component_code)}
+		):
+			return ComponentMigration(file_path, "skipped", manifest_entry)
+
+		# Generate the component
+		component_code = component.generate()
+		removed_safe_regions: list[str] = []
+		if old_component_code is not None:
+			try:
+				# If the same component has been generated before, take the safe regions from the already existing components
+				component_code, removed_safe_regions = merge_safe_regions(component_code, old_component_code)
+			except ValueError as e:
+				raise ValueError(f"Failed to merge safe regions in '{os.path.basename(file_path)}': {e}")
+			if removed_safe_regions:
+				# Keep a backup of the old file, since the content of the removed safe regions would be lost otherwise
+				with open(f"{file_path}.bak", "w") as f:
+					f.write(old_component_code)
+		manifest_entry = {**hashes, "output": hash_text(component_code)}
+		# Only write the file if it changed, so that its modification time stays the same otherwise
+		if component_code == old_component_code:
+			return ComponentMigration(file_path, "unchanged", manifest_entry)
+		os.makedirs(os.path.dirname(file_path), exist_ok=True)
+		with open(file_path, "w") as f:
+			f.write(component_code)
+		return ComponentMigration(file_path, "generated", manifest_entry, removed_safe_regions=removed_safe_regions)
+	except Exception as e:
+		return ComponentMigration(file_path, error=e)
+
+
+def hash_text(text: str) -> str:
+	"""Hash the `text` for the manifest."""
+	return hashlib.sha256(text.encode()).hexdigest()
+
+
+def hash_inputs(component: UiComponent) -> str:
+	"""Hash everything the component is rendered from, except the template."""
+	return hash_text(repr((component.__class__.__qualname__, component.ui_framework.value, component.get_template_name(), component.get_template_context())))
+
+
+def hash_template(component: UiComponent) -> str:
+	"""Hash the source of the template the component is rendered with."""
+	environment = engines["jinja2"].env # type: ignore
+	source, _, _ = environment.loader.get_source(environment, component.get_template_name())
+	return hash_text(source)
+
+
+def load_manifest(path: str) -> dict[str, dict[str, str]]:
+	"""Load the manifest of the frontend at `path` (empty if there is none yet)."""
+	try:
+		with open(f"{path}/{MANIFEST_FILE_NAME}", "r") as f:
+			return json.load(f)
+	except (FileNotFoundError, json.JSONDecodeError):
+		return {}
+
+
+def save_manifest(path: str, manifest: dict[str, dict[str, str]]) -> None:
+	"""Save the manifest of the frontend at `path`, if it changed."""
+	content = json.dumps(manifest, indent="\t", sort_keys=True) + "\n"
+	try:
+		with open(f"{path}/{MANIFEST_FILE_NAME}", "r") as f:
+			if f.read() == content:
+				return
+	except FileNotFoundError:
+		pass
+	with open(f"{path}/{MANIFEST_FILE_NAME}", "w") as f:
+		f.write(content)
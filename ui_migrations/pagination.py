@@ -0,0 +1,100 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models
+
+
+class InvalidCursor(ValueError):
+	"""Raised when a cursor can't be decoded or doesn't fit the model."""
+
+
+def encode_cursor(sort_by: str, sort_dir: str, value: str | None, pk: str, backwards: bool = False) -> str:
+	"""Encode the position after (or before if `backwards`) the item with the sort `value` (`None` for `NULL`) and `pk` as an opaque cursor."""
+	data = {"s": sort_by, "d": sort_dir, "v": value, "pk": pk, "b": backwards}
+	return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+	"""Decode a cursor created by `encode_cursor`."""
+	try:
+		data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+	except (binascii.Error, ValueError, UnicodeDecodeError):
+		raise InvalidCursor("Invalid cursor.")
+	if not isinstance(data, dict) or not {"s", "d", "v", "pk", "b"} <= data.keys():
+		raise InvalidCursor("Invalid cursor.")
+	return data
+
+
+def paginate_by_cursor(
+		query_set: models.QuerySet,
+		sort_by: str | None,
+		sort_dir: str | None,
+		cursor: str | None,
+		page_size: int,
+) -> tuple[list[models.Model], str | None, str | None]:
+	"""
+	Get a page of the `query_set` with keyset pagination on the sort field (with the primary key as tie-breaker), starting at the `cursor`.
+	Returns the items of the page and the cursors for the next and the previous page (`None` if there is no such page).
+	Items with a `NULL` value of the sort field come after all others in ascending order (and first in descending order).
+	"""
+	model = query_set.model
+	pk_name: str = model._meta.pk.name # type: ignore
+	sort_by = sort_by or "pk"
+	sort_dir = "desc" if sort_dir == "desc" else "asc"
+	try:
+		sort_field = model._meta.pk if sort_by == "pk" else model._meta.get_field(sort_by)
+	except FieldDoesNotExist:
+		raise InvalidCursor(f"Cannot paginate by cursor on field {sort_by}.")
+	if not getattr(sort_field, "concrete", False) or sort_field.many_to_many: # type: ignore
+		raise InvalidCursor(f"Cannot paginate by cursor on field {sort_by}.")
+	sort_on_pk = sort_field == model._meta.pk
+
+	position = decode_cursor(cursor) if cursor else None
+	# a cursor from a different sorting starts at the first page again
+	if position and (position["s"] != sort_by or position["d"] != sort_dir):
+		position = None
+	backwards = bool(position and position["b"])
+	descending = (sort_dir == "desc") != backwards
+
+	if position:
+		try:
+			value = None if position["v"] is None else sort_field.to_python(position["v"]) # type: ignore
+			pk = model._meta.pk.to_python(position["pk"]) # type: ignore
+		except (ValidationError, TypeError, ValueError):
+			raise InvalidCursor("Invalid cursor.")
+		lookup = "lt" if descending else "gt"
+		if sort_on_pk:
+			query_set = query_set.filter(**{f"pk__{lookup}": pk})
+		elif value is None:
+			# after a `NULL` value, only other `NULL` values follow in ascending order, while all other values follow in descending order
+			after = models.Q(**{sort_by: None, f"pk__{lookup}": pk})
+			query_set = query_set.filter(after | models.Q(**{f"{sort_by}__isnull": False}) if descending else after)
+		else:
+			after = models.Q(**{f"{sort_by}__{lookup}": value}) | models.Q(**{sort_by: value, f"pk__{lookup}": pk})
+			# comparisons with `NULL` are never true, so the `NULL` values that follow in ascending order are added explicitly
+			query_set = query_set.filter(after if descending or not sort_field.null else after | models.Q(**{f"{sort_by}__isnull": True}))
+
+	# `NULL` values are ordered like the largest values on all databases
+	sort_expression = models.F(pk_name if sort_on_pk else sort_by)
+	ordering = [sort_expression.desc(nulls_first=True) if descending else sort_expression.asc(nulls_last=True)]
+	if not sort_on_pk:
+		ordering.append(("-" if descending else "") + pk_name)
+	# fetch one more item to know whether there is another page in this direction
+	items = list(query_set.order_by(*ordering)[:page_size + 1])
+	has_more = len(items) > page_size
+	items = items[:page_size]
+	if backwards:
+		items.reverse()
+
+	def cursor_for(item: models.Model, backwards: bool) -> str:
+		# the values are encoded as strings without loss of precision (e.g. microseconds of datetimes), and `NULL` as `None`
+		value = None if sort_field.value_from_object(item) is None else sort_field.value_to_string(item) # type: ignore
+		return encode_cursor(sort_by, sort_dir, value, model._meta.pk.value_to_string(item), backwards) # type: ignore
+
+	has_next = (not backwards and has_more) or (backwards and position is not None)
+	has_prev = (backwards and has_more) or (not backwards and position is not None)
+	next_cursor = cursor_for(items[-1], False) if items and has_next else None
+	prev_cursor = cursor_for(items[0], True) if items and has_prev else None
+	return items, next_cursor, prev_cursor
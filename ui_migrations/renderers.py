@@ -0,0 +1,39 @@
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+
+class ORJSONRenderer(BaseRenderer):
+	"""
+	Faster JSON renderer using `orjson`, which renders the data of the generated endpoints like the `JSONRenderer` of Django REST framework, except for some floats:
+	`orjson` writes exponents without a sign and leading zeros (`1e16` instead of `1e+16`), writes small numbers without an exponent (`0.00001` instead of `1e-05`),
+	and renders `NaN` and infinity as `null` instead of rejecting them. It also ignores the `indent` parameter of the media type.
+	"""
+	media_type = "application/json"
+	format = "orjson"
+	charset = None
+
+	def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+		if data is None:
+			return b""
+		# datetimes, decimals etc. are encoded like by Django REST framework
+		content: bytes = orjson.dumps(data, default=JSONEncoder().default, option=orjson.OPT_PASSTHROUGH_DATETIME) # type: ignore
+		# escape the line separators like Django REST framework, as they end lines in JavaScript strings
+		return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+def get_renderer_classes() -> list[type[BaseRenderer]]:
+	"""
+	Get the renderers for the generated endpoints: the configured default renderers, preceded by the `ORJSONRenderer` if `orjson` is installed and enabled with the `UI_MIGRATIONS_ORJSON` setting.
+	Clients can still request the default JSON renderer with `?format=json`.
+	"""
+	renderer_classes = list(api_settings.DEFAULT_RENDERER_CLASSES)
+	if orjson is not None and getattr(settings, "UI_MIGRATIONS_ORJSON", False):
+		renderer_classes.insert(0, ORJSONRenderer)
+	return renderer_classes
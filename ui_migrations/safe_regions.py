@@ -0,0 +1,89 @@
+import dataclasses
+import re
+
+
+SAFE_REGION_MARKER_PATTERN = re.compile(
+	r"\/\* SAFE REGION (BEGIN|END)(?: ([\w.-]+))? \*\/|<!-- SAFE REGION (BEGIN|END)(?: ([\w.-]+))? -->"
+)
+"""RegEx pattern for matching the begin and end markers of safe regions, e.g. `/* SAFE REGION BEGIN name */` (the name is optional)"""
+
+
+@dataclasses.dataclass
+class SafeRegion:
+	"""A safe region in a component's code."""
+	name: str | None
+	"""Name of the safe region (or `None` for unnamed safe regions, which are matched by position)"""
+	content_start: int
+	"""Index of the first character after the begin marker"""
+	content_end: int
+	"""Index of the first character of the end marker"""
+
+
+def find_safe_regions(code: str) -> list[SafeRegion]:
+	"""Find all safe regions in the `code` in a single pass over the markers."""
+	safe_regions: list[SafeRegion] = []
+	open_region: tuple[str | None, int] | None = None
+	names: set[str | None] = set()
+	for match in SAFE_REGION_MARKER_PATTERN.finditer(code):
+		kind = match.group(1) or match.group(3)
+		name = match.group(2) or match.group(4)
+		# the line is only counted for error messages, to keep this linear
+		line = lambda: code.count("\n", 0, match.start()) + 1
+		if kind == "BEGIN":
+			if open_region is not None:
+				raise ValueError(f"Safe region beginning in line {line()} is nested in another safe region.")
+			open_region = (name, match.end())
+		else:
+			if open_region is None:
+				raise ValueError(f"Safe region ending in line {line()} has not begun.")
+			if name is not None and name != open_region[0]:
+				raise ValueError(f"Safe region ending in line {line()} is named '{name}', but the safe region that began is named '{open_region[0]}'.")
+			if open_region[0] is not None and open_region[0] in names:
+				raise ValueError(f"Safe region '{open_region[0]}' ending in line {line()} exists more than once.")
+			names.add(open_region[0])
+			safe_regions.append(SafeRegion(open_region[0], open_region[1], match.start()))
+			open_region = None
+	if open_region is not None:
+		raise ValueError(f"Safe region {repr(open_region[0]) + ' ' if open_region[0] is not None else ''}does not end.")
+	return safe_regions
+
+
+def merge_safe_regions(new_component_code: str, old_component_code: str) -> tuple[str, list[str]]:
+	"""
+	Replace the contents of all safe regions in the new component code with the contents of the safe regions from the old component code.
+	Named safe regions are matched by name, so they can be added and removed. Unnamed safe regions are matched by position and their number must not change.
+	Returns the merged code and the names of safe regions with content in the old component code that don't exist in the new one anymore.
+	"""
+	new_safe_regions = find_safe_regions(new_component_code)
+	old_safe_regions = find_safe_regions(old_component_code)
+
+	old_contents_by_name = {region.name: old_component_code[region.content_start:region.content_end] for region in old_safe_regions if region.name is not None}
+	old_unnamed_contents = [old_component_code[region.content_start:region.content_end] for region in old_safe_regions if region.name is None]
+	new_unnamed_count = sum(region.name is None for region in new_safe_regions)
+
+	# code generated before safe regions were named only has unnamed safe regions, which are matched by position once
+	if not old_contents_by_name and len(old_unnamed_contents) == len(new_safe_regions):
+		old_contents = old_unnamed_contents
+	elif len(old_unnamed_contents) != new_unnamed_count:
+		raise ValueError("The newly generated component has a different number of unnamed safe regions than the existing component.")
+	else:
+		old_contents = None
+	old_unnamed_iter = iter(old_unnamed_contents)
+
+	merged_code_parts: list[str] = []
+	position = 0
+	for index, region in enumerate(new_safe_regions):
+		merged_code_parts.append(new_component_code[position:region.content_start])
+		if old_contents is not None:
+			merged_code_parts.append(old_contents[index])
+		elif region.name is None:
+			merged_code_parts.append(next(old_unnamed_iter))
+		else:
+			# safe regions that are new keep their generated content
+			merged_code_parts.append(old_contents_by_name.get(region.name, new_component_code[region.content_start:region.content_end]))
+		position = region.content_end
+	merged_code_parts.append(new_component_code[position:])
+
+	new_names = {region.name for region in new_safe_regions}
+	removed_names = [name for name, content in old_contents_by_name.items() if name not in new_names and content.strip()]
+	return "".join(merged_code_parts), removed_names
@@ -1,116 +1,448 @@
 from rest_framework import serializers
 from rest_framework.response import Response
 from rest_framework.request import Request
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from django.urls import path, URLPattern
-from django.db import models
+from django.db import models, transaction
 from django.db.models.fields import related
 from django.contrib.auth.models import User
 from django.core.paginator import Paginator
-from typing import Literal
-from .components import UiComponent
+from django.http import StreamingHttpResponse
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.conf import settings
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Literal, Callable
+import threading
+import functools
+from asgiref.sync import sync_to_async
+from .components import UiComponent, ActionOptions
+from .pagination import paginate_by_cursor, InvalidCursor
+from .caching import conditional_response, aconditional_response, invalidate_model, ainvalidate_model, connect_invalidation_signals, get_response_cache
+from .exporting import stream_csv, stream_ndjson
+from .renderers import get_renderer_classes
+from .instrumentation import instrument
+from .change_feed import is_change_feed_enabled, connect_change_signals, publish_changes, create_change_feed_view
+from .async_views import is_async_views_enabled, async_api_view
 
 
 
+class SerializerCache:
+	"""Bounded LRU cache for the serializer classes that are generated for a model and a set of fields."""
+
+	def __init__(self, maxsize: int = 256):
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self._serializers: OrderedDict[tuple[type[models.Model], tuple[str, ...]], type[serializers.ModelSerializer]] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, model: type[models.Model], fields: list[str]) -> type[serializers.ModelSerializer]:
+		"""Get the serializer class for the `model` with the given `fields`, creating it if it is not cached yet."""
+		# Normalize the fields, but keep their order as it determines the order of the keys in the response
+		key = (model, tuple(dict.fromkeys(field.strip() for field in fields if field.strip())))
+		with self._lock:
+			if (serializer := self._serializers.get(key)) is not None:
+				self._serializers.move_to_end(key)
+				self.hits += 1
+				return serializer
+			self.misses += 1
+		serializer = create_serializer(model, list(key[1]))
+		with self._lock:
+			self._serializers[key] = serializer
+			self._serializers.move_to_end(key)
+			while len(self._serializers) > self.maxsize:
+				self._serializers.popitem(last=False)
+		return serializer
+
+	def info(self) -> dict[str, int]:
+		"""Get the hit and miss counters and the current and maximum size of the cache."""
+		with self._lock:
+			return {"hits": self.hits, "misses": self.misses, "size": len(self._serializers), "maxsize": self.maxsize}
+
+	def clear(self) -> None:
+		"""Remove all cached serializers and reset the counters."""
+		with self._lock:
+			self._serializers.clear()
+			self.hits = 0
+			self.misses = 0
+
+
+def create_serializer(_model: type[models.Model], _fields: list[str]) -> type[serializers.ModelSerializer]:
+	"""Create a serializer for the model with the given fields. Relations are nested one level deep and read-only, so saving only writes the fields of the item itself."""
+	class Serializer(serializers.ModelSerializer):
+		class Meta:
+			model = _model
+			fields = _fields + ["pk"]
+			depth = 1
+	return Serializer
+
+
+serializer_cache = SerializerCache(getattr(settings, "UI_MIGRATIONS_SERIALIZER_CACHE_SIZE", 256))
+"""Cache for the generated serializer classes (size configurable with the `UI_MIGRATIONS_SERIALIZER_CACHE_SIZE` setting)"""
+
+
+def get_serializer(model: type[models.Model], fields: list[str]) -> type[serializers.ModelSerializer]:
+	"""Get a (cached) serializer for the model with the given fields."""
+	return serializer_cache.get(model, fields)
+
+
+@functools.lru_cache(maxsize=256)
+def get_values_converter(model: type[models.Model], fields: tuple[str, ...]) -> Callable[[dict], dict] | None:
+	"""
+	Get a function that converts a row of `.values()` of the `fields` into the same data as the serializer would create from the model instance,
+	or `None` if the fields need the serializer (e.g. because they are nested relations).
+	"""
+	for field_name in fields:
+		if field_name == "pk":
+			continue
+		try:
+			field = model._meta.get_field(field_name)
+		except FieldDoesNotExist:
+			return None
+		# files are represented by their URL, which needs the model instance
+		if field.is_relation or not field.concrete or isinstance(field, models.FileField):
+			return None
+	# use the serializer fields once, to represent the values exactly like the serializer
+	converters = [(field_name, serializer_field.to_representation) for field_name, serializer_field in get_serializer(model, list(fields))().fields.items()]
+	def convert(values: dict) -> dict:
+		return {field_name: (None if (value := values[field_name]) is None else to_representation(value)) for field_name, to_representation in converters}
+	return convert
+
+
+@dataclass(frozen=True)
+class AccessTable:
+	"""Access specifications of a model, compiled into sets of fields per role so that permission checks are set operations."""
+	addable_by_roles: frozenset[str]
+	"""Roles that are allowed to add items"""
+	removable_by_roles: frozenset[str]
+	"""Roles that are allowed to remove items"""
+	public_fields: frozenset[str]
+	"""Fields that are visible for all roles"""
+	visible_fields_by_role: dict[str, frozenset[str]]
+	"""Fields that are visible for a role (in addition to `public_fields`)"""
+	modifiable_fields_by_role: dict[str, frozenset[str]]
+	"""Fields that are modifiable by a role"""
+	sortable_fields: frozenset[str] | None = None
+	"""Fields that items can be sorted by (or `None` if all fields are allowed)"""
+	filter_keys: frozenset[str] | None = None
+	"""Query keys (`field` or `field__lookup`) that items can be filtered by (or `None` if all keys are allowed)"""
+
+	@classmethod
+	def compile(
+			cls,
+			addable_by_roles: set[str],
+			removable_by_roles: set[str],
+			modifiable_by_roles: dict[str, set[str]],
+			visible_by_roles: dict[str, set[str] | Literal[True]],
+			sortable_fields: set[str] | None = None,
+			filterable_lookups: dict[str, set[str]] | None = None,
+	) -> "AccessTable":
+		"""Compile the access specifications per field into field sets per role, and the allowed lookups per field into allowed query keys."""
+		visible_fields_by_role: dict[str, set[str]] = {}
+		for field, roles in visible_by_roles.items():
+			if roles == True:
+				continue
+			for role in roles: # type: ignore
+				visible_fields_by_role.setdefault(role, set()).add(field)
+		modifiable_fields_by_role: dict[str, set[str]] = {}
+		for field, roles in modifiable_by_roles.items():
+			for role in roles:
+				modifiable_fields_by_role.setdefault(role, set()).add(field)
+		return cls(
+			addable_by_roles=frozenset(addable_by_roles),
+			removable_by_roles=frozenset(removable_by_roles),
+			public_fields=frozenset(field for field, roles in visible_by_roles.items() if roles == True),
+			visible_fields_by_role={role: frozenset(fields) for role, fields in visible_fields_by_role.items()},
+			modifiable_fields_by_role={role: frozenset(fields) for role, fields in modifiable_fields_by_role.items()},
+			sortable_fields=frozenset(sortable_fields) if sortable_fields is not None else None,
+			filter_keys=frozenset(
+				field if lookup == "exact" else f"{field}__{lookup}"
+				for field, lookups in filterable_lookups.items()
+				for lookup in lookups
+			) if filterable_lookups is not None else None,
+		)
+
+	def visible_fields(self, roles: frozenset[str]) -> frozenset[str]:
+		"""Get all fields that are visible for any of the `roles`."""
+		return self.public_fields.union(*(self.visible_fields_by_role.get(role, ()) for role in roles))
+
+	def modifiable_fields(self, roles: frozenset[str]) -> frozenset[str]:
+		"""Get all fields that are modifiable by any of the `roles`."""
+		return frozenset().union(*(self.modifiable_fields_by_role.get(role, ()) for role in roles))
+
+	def first_invisible_field(self, fields: list[str], roles: frozenset[str]) -> str | None:
+		"""Get the first of the `fields` that is not visible for any of the `roles` (or `None` if all of them are)."""
+		visible_fields = self.visible_fields(roles)
+		return next((field for field in fields if field not in visible_fields), None)
+
+	def first_unmodifiable_field(self, fields: list[str], roles: frozenset[str]) -> str | None:
+		"""Get the first of the `fields` that is not modifiable by any of the `roles` (or `None` if all of them are)."""
+		modifiable_fields = self.modifiable_fields(roles)
+		return next((field for field in fields if field not in modifiable_fields), None)
+
+	def can_sort_by(self, field: str | None) -> bool:
+		"""Check if items can be sorted by the `field` (`None` and `pk` for sorting by primary key are always allowed)."""
+		return self.sortable_fields is None or field in (None, "pk") or field in self.sortable_fields
+
+	def first_unfilterable_key(self, keys: list[str]) -> str | None:
+		"""Get the first of the query `keys` that items can't be filtered by (or `None` if all of them are allowed)."""
+		if self.filter_keys is None:
+			return None
+		return next((key for key in keys if key not in self.filter_keys), None)
+
+	def can_add(self, roles: frozenset[str]) -> bool:
+		"""Check if any of the `roles` is allowed to add items."""
+		return not self.addable_by_roles.isdisjoint(roles)
+
+	def can_remove(self, roles: frozenset[str]) -> bool:
+		"""Check if any of the `roles` is allowed to remove items."""
+		return not self.removable_by_roles.isdisjoint(roles)
+
+
+def get_user_roles(request: Request) -> frozenset[str]:
+	"""Get the names of the groups (roles) of the requesting user. The groups are only queried once per request."""
+	# store the roles on the underlying Django request, so that they are shared by all views handling it
+	http_request = getattr(request, "_request", request)
+	roles: frozenset[str] | None = getattr(http_request, "_ui_migrations_roles", None)
+	if roles is None:
+		user: User = request.user
+		roles = frozenset(user.groups.values_list("name", flat=True)) if user.is_authenticated else frozenset()
+		http_request._ui_migrations_roles = roles # type: ignore
+	return roles
+
+
+async def aget_user_roles(request: Request) -> frozenset[str]:
+	"""Async version of `get_user_roles` (the user has to be authenticated already)."""
+	http_request = getattr(request, "_request", request)
+	roles: frozenset[str] | None = getattr(http_request, "_ui_migrations_roles", None)
+	if roles is None:
+		user: User = request.user
+		roles = frozenset([name async for name in user.groups.values_list("name", flat=True)]) if user.is_authenticated else frozenset()
+		http_request._ui_migrations_roles = roles # type: ignore
+	return roles
+
+
+def get_requested_fields(request: Request) -> list[str]:
+	"""Get the fields requested in the `_fields` query parameter, e.g. `?_fields=id,name,price`."""
+	query_params = {key: (value[0] if isinstance(value, list) else value) for key, value in request.query_params.dict().items()}
+	fields_str = query_params.pop("_fields", "")
+	return fields_str.split(",") if fields_str else []
+
+
+@dataclass
+class ItemsQuery:
+	"""Parameters of a request for multiple items, parsed from its URL query."""
+	fields: list[str]
+	"""Fields to be included in the response"""
+	sort_by: str | None
+	sort_dir: str | None
+	page_number: int
+	page_size: int
+	cursor_pagination: bool
+	"""Whether to use keyset pagination (`_pagination=cursor`) with the cursor in `cursor`"""
+	cursor: str | None
+	with_total: bool
+	filters: dict[str, str]
+	"""The remaining query parameters, which filter the items"""
+	normalized_query: tuple
+	"""The query parameters, which identify the response in the cache"""
+
+	@classmethod
+	def parse(cls, request: Request) -> "ItemsQuery":
+		"""Parse the query of the `request`."""
+		query_params = {key: (value[0] if isinstance(value, list) else value) for key, value in request.query_params.dict().items()}
+		normalized_query = tuple(sorted((key, value) for key, value in query_params.items() if key != "format"))
+		fields_str = query_params.pop("_fields", "")
+		sort_by = query_params.pop("_sortBy", None)
+		sort_dir = query_params.pop("_sortDir", None)
+		page_number = int(query_params.pop("_page", 1))
+		page_size = int(query_params.pop("_pageSize", 10))
+		cursor_pagination = query_params.pop("_pagination", None) == "cursor"
+		cursor = query_params.pop("_cursor", None)
+		with_total = query_params.pop("_withTotal", None) == "true"
+		# remove the format query parameter if it exists
+		query_params.pop("format", None)
+		return cls(
+			fields=fields_str.split(",") if fields_str else [],
+			sort_by=sort_by,
+			sort_dir=sort_dir,
+			page_number=page_number,
+			page_size=page_size,
+			cursor_pagination=cursor_pagination,
+			cursor=cursor,
+			with_total=with_total,
+			filters=query_params,
+			normalized_query=normalized_query,
+		)
+
+	def get_ordering(self) -> str:
+		"""Get the ordering for `order_by` (by primary key if no sort field is given)."""
+		return ("-" if self.sort_dir == "desc" else "") + (self.sort_by if self.sort_by else "pk")
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+	"""Joins, prefetches and loaded columns for serializing the given fields of a model."""
+	select_related: tuple[str, ...]
+	prefetch_related: tuple[str, ...]
+	only: tuple[str, ...] | None
+	"""Columns that need to be loaded (or `None` if all columns should be loaded)"""
+
+	def apply(self, query_set: models.QuerySet) -> models.QuerySet:
+		"""Apply the plan to the `query_set`."""
+		if self.select_related:
+			query_set = query_set.select_related(*self.select_related)
+		if self.prefetch_related:
+			query_set = query_set.prefetch_related(*self.prefetch_related)
+		if self.only is not None:
+			query_set = query_set.only(*self.only)
+		return query_set
+
+
+@functools.lru_cache(maxsize=256)
+def get_query_plan(model: type[models.Model], fields: tuple[str, ...]) -> QueryPlan:
+	"""Plan the query for serializing the `fields` of the `model` (with nested relations of depth 1) without additional queries per item."""
+	select_related: list[str] = []
+	prefetch_related: list[str] = []
+	only: list[str] | None = [model._meta.pk.name] # type: ignore
+	for field_name in fields:
+		if field_name == "pk":
+			continue
+		try:
+			field = model._meta.get_field(field_name)
+		except FieldDoesNotExist:
+			# the field might be a property that depends on any other field, so all columns are loaded
+			only = None
+			continue
+		if field.many_to_one or field.one_to_one:
+			if field.concrete:
+				select_related.append(field_name)
+				if only is not None:
+					only.append(field_name)
+			else:
+				# reverse one to one relations are not joined, as they might not exist
+				prefetch_related.append(field_name)
+			# the nested items are serialized without depth, so their many to many fields are lists of primary keys
+			prefetch_related.extend(f"{field_name}__{m2m.name}" for m2m in field.related_model._meta.many_to_many) # type: ignore
+		elif field.many_to_many or field.one_to_many:
+			prefetch_related.append(field_name)
+			prefetch_related.extend(f"{field_name}__{m2m.name}" for m2m in field.related_model._meta.many_to_many) # type: ignore
+		elif only is not None and field.concrete:
+			only.append(field_name)
+	return QueryPlan(
+		select_related=tuple(select_related),
+		prefetch_related=tuple(prefetch_related),
+		only=tuple(dict.fromkeys(only)) if only is not None else None,
+	)
+
+
 def get_urlpatterns(
 		model: type[models.Model],
 		addable_by_roles: set[str],
 		removable_by_roles: set[str],
 		modifiable_by_roles: dict[str, set[str]],
 		visible_by_roles: dict[str, set[str] | Literal[True]],
+		actions_options: dict[str, list[ActionOptions]] | None = None,
+		sortable_fields: set[str] | None = None,
+		filterable_lookups: dict[str, set[str]] | None = None,
 ) -> list[URLPattern]:
-	"""Create REST endpoints for the model and return their paths"""
-	def get_serializer(_model: type[models.Model], _fields: list[str]) -> type[serializers.ModelSerializer]:
-		"""Create a serializer for the model with the given fields."""
-		class Serializer(serializers.ModelSerializer):
-			class Meta:
-				model = _model
-				fields = _fields + ["pk"]
-				depth = 1
-			def update(self, instance: models.Model, validated_data: dict):
-				for field, value in validated_data.items():
-					if isinstance(value, list):
-						for item in value:
-							id = item.pop("pk", None)
-							related_model: models.Model = getattr(instance, field).model
-							if id:
-								related_instance = related_model.objects.filter(id=id).first()
-								if related_instance:
-									for key, val in item.items():
-										setattr(related_instance, key, val)
-									related_instance.save()
-					else:
-						setattr(instance, field, value)
-				instance.save()
-				return instance
-		return Serializer
-	
+	"""Create REST endpoints for the model and return their paths. Sorting and filtering is only restricted if `sortable_fields` and `filterable_lookups` are given."""
+	# Compile the access specifications once, so that the permission checks don't need to query per field
+	access = AccessTable.compile(addable_by_roles, removable_by_roles, modifiable_by_roles, visible_by_roles, sortable_fields, filterable_lookups)
+	# Compile the actions of every component into the roles allowed to run them and the updates they make on the server
+	actions_updates: dict[str, list[tuple[frozenset[str], dict]]] = {
+		component_name: [
+			(frozenset(options.roles), dict(update for action in options.actions if (update := action.get_update(model)) is not None))
+			for options in component_actions_options
+		]
+		for component_name, component_actions_options in (actions_options or {}).items()
+	}
+	# Invalidate cached responses when the data is changed outside of these endpoints
+	if get_response_cache() is not None:
+		connect_invalidation_signals(model)
+	# The field names of the model are used as the fields for creating and updating items
+	model_field_names = [field.name for field in model._meta.fields]
+	# and the columns except the primary key are the fields that bulk updates can write
+	updatable_field_names = frozenset(field.name for field in model._meta.concrete_fields if not field.primary_key)
+	# Publish the changes of the items to the change feed, serialized like the responses of the endpoints
+	change_feed = is_change_feed_enabled()
+	if change_feed:
+		connect_change_signals(model, lambda instance: dict(get_serializer(model, model_field_names)(instance).data))
+
+	def check_query(query: ItemsQuery) -> Response | None:
+		"""Check if sorting and filtering as given in the `query` is allowed, to prevent expensive queries, and return the error response if not."""
+		if not access.can_sort_by(query.sort_by):
+			return Response(status=400, data={"error": f"Sorting by field {query.sort_by} is not allowed."})
+		if (key := access.first_unfilterable_key(list(query.filters.keys()))) is not None:
+			return Response(status=400, data={"error": f"Filtering by {key} is not allowed."})
+		return None
+
 	def get_item_view(request: Request, pk: int):
 		"""Get a single item."""
-
-		user: User = request.user
-		# URL query of the form ?_fields=id,name,price
-		query_params = {key: (value[0] if isinstance(value, list) else value) for key, value in request.query_params.dict().items()}
-		fields_str = query_params.pop("_fields", "")
-		# remove the format query parameter if it exists
-		query_params.pop("format", None)
-		fields = fields_str.split(",") if fields_str else []
+		fields = get_requested_fields(request)
 		
-		# check if the user has permission to view the fields
-		for field in fields:
-			field_visible_by_roles = visible_by_roles.get(field, [])
-			if (not field_visible_by_roles == True) and (not user.groups.filter(name__in=field_visible_by_roles).exists()):
+		# check if the user has permission to view the fields (the roles are only needed if not all fields are public)
+		if not access.public_fields.issuperset(fields):
+			if (field := access.first_invisible_field(fields, get_user_roles(request))) is not None:
 				return Response(status=403, data={"error": f"User does not have permission to view field {field}."})
 		
-		item = model.objects.filter(pk=pk).first()
-		Serializer = get_serializer(model, fields)
-		return Response(data=Serializer(item).data if item else {})
+		def get_response() -> Response:
+			Serializer = get_serializer(model, fields)
+			# without nested relations, the row is converted directly without creating a model instance and a serializer
+			if convert := get_values_converter(model, tuple(Serializer.Meta.fields)):
+				values = model.objects.filter(pk=pk).values(*Serializer.Meta.fields).first()
+				return Response(data=convert(values) if values else {})
+			item = get_query_plan(model, tuple(fields)).apply(model.objects.filter(pk=pk)).first()
+			return Response(data=Serializer(item).data if item else {})
+
+		return conditional_response(request, model, ("item", pk, tuple(fields)), get_response)
 	
 
 	def post_item_view(request: Request):
 		"""Create a new item."""
 
-		user: User = request.user
 		# check if the user has permission to add items
-		if not user.groups.filter(name__in=addable_by_roles).exists():
+		if not access.can_add(get_user_roles(request)):
 			return Response(status=403, data={"error": "User does not have permission to add items."})
 		
-		Serializer = get_serializer(model, [field.name for field in model._meta.fields])
+		Serializer = get_serializer(model, model_field_names)
 		serializer = Serializer(data=request.data)
 		serializer.is_valid(raise_exception=True)
 		created_item = serializer.save()
+		invalidate_model(model)
 		return Response(data=Serializer(created_item).data)
 	
 
 	def patch_item_view(request: Request, pk: int):
 		"""Update an existing item."""
 
-		user: User = request.user
 		# check if the user has permission to modify the fields of the item
-		for field in request.data.keys(): # type: ignore
-			if not user.groups.filter(name__in=modifiable_by_roles.get(field, [])).exists():
-				return Response(status=403, data={"error": f"User does not have permission to modify field {field}."})
+		if (field := access.first_unmodifiable_field(list(request.data.keys()), get_user_roles(request))) is not None: # type: ignore
+			return Response(status=403, data={"error": f"User does not have permission to modify field {field}."})
 		
-		Serializer = get_serializer(model, [field.name for field in model._meta.fields])
+		Serializer = get_serializer(model, model_field_names)
 		serializer = Serializer(model.objects.filter(pk=pk).first(), data=request.data, partial=True)
 		serializer.is_valid(raise_exception=True)
 		updated_item = serializer.save()
+		invalidate_model(model)
 		return Response(data=Serializer(updated_item).data)
 	
 
 	def delete_item_view(request: Request, pk: int):
 		"""Delete an existing item."""
 
-		user: User = request.user
 		# check if the user has permission to remove items
-		if not user.groups.filter(name__in=removable_by_roles).exists():
+		if not access.can_remove(get_user_roles(request)):
 			return Response(status=403, data={"error": "User does not have permission to remove items."})
 		
 		model.objects.filter(pk=pk).delete()
+		invalidate_model(model)
 		return Response(status=204)
 	
 
 	@api_view(['GET', 'PATCH', 'DELETE'])
+	@renderer_classes(get_renderer_classes())
 	def item_view(request: Request, pk: int):
 		"""Get, create, update or delete a single item."""
 		match request.method:
@@ -124,38 +456,56 @@ def get_urlpatterns(
 
 	def get_items_view(request: Request):
 		"""Get multiple items consisting of the given _fields and matching the filter query."""
-		user: User = request.user
+		query = ItemsQuery.parse(request)
 
-		query_params = {key: (value[0] if isinstance(value, list) else value) for key, value in request.query_params.dict().items()}
-		fields_str = query_params.pop("_fields", "")
-		sort_by = query_params.pop("_sortBy", None)
-		sort_dir = query_params.pop("_sortDir", None)
-		page_number = int(query_params.pop("_page", 1))
-		page_size = int(query_params.pop("_pageSize", 10))
-		# remove the format query parameter if it exists
-		query_params.pop("format", None)
-		# get the fields to be included in the response
-		fields = fields_str.split(",") if fields_str else []
+		# check if the sorting and the filters are allowed, to prevent expensive queries
+		if (error_response := check_query(query)) is not None:
+			return error_response
 
-		# check if the user has permission to view the fields
-		for field in fields:
-			field_visible_by_roles = visible_by_roles.get(field, [])
-			if (not field_visible_by_roles == True) and (not user.groups.filter(name__in=field_visible_by_roles).exists()):
+		# check if the user has permission to view the fields (the roles are only needed if not all fields are public)
+		if not access.public_fields.issuperset(query.fields):
+			if (field := access.first_invisible_field(query.fields, get_user_roles(request))) is not None:
 				return Response(status=403, data={"error": f"User does not have permission to view field {field}."})
 
-		query_set = model.objects.filter(**query_params).order_by(("-" if sort_dir == "desc" else "") + (sort_by if sort_by else "pk"))
-		paginator = Paginator(query_set, page_size)
-		page = paginator.get_page(page_number)
-		# create a serializer for the model with the given fields
-		Serializer = get_serializer(model, fields)
-		return Response(data={
-			"items": [Serializer(item).data for item in page],
-			"totalItems": paginator.count,
-			"totalPages": paginator.num_pages,
-			"page": page_number,
-		})
+		def get_response() -> Response:
+			# create a serializer for the model with the given fields
+			Serializer = get_serializer(model, query.fields)
+
+			if query.cursor_pagination:
+				# the sort field is loaded as well, since the cursors are created from its values
+				query_plan = get_query_plan(model, tuple(query.fields) + ((query.sort_by,) if query.sort_by else ()))
+				query_set = query_plan.apply(model.objects.filter(**query.filters))
+				try:
+					items, next_cursor, prev_cursor = paginate_by_cursor(query_set, query.sort_by, query.sort_dir, query.cursor, query.page_size)
+				except InvalidCursor as e:
+					return Response(status=400, data={"error": str(e)})
+				data = {
+					"items": Serializer(items, many=True).data,
+					"nextCursor": next_cursor,
+					"prevCursor": prev_cursor,
+				}
+				# counting is optional, as it is what makes large tables slow
+				if query.with_total:
+					data["totalItems"] = query_set.count()
+				return Response(data=data)
+
+			query_set = get_query_plan(model, tuple(query.fields)).apply(model.objects.filter(**query.filters)).order_by(query.get_ordering())
+			# without nested relations, the rows are converted directly without creating model instances and serializers
+			if convert := get_values_converter(model, tuple(Serializer.Meta.fields)):
+				query_set = query_set.values(*Serializer.Meta.fields)
+			paginator = Paginator(query_set, query.page_size)
+			page = paginator.get_page(query.page_number)
+			return Response(data={
+				"items": [convert(values) for values in page] if convert else Serializer(page, many=True).data,
+				"totalItems": paginator.count,
+				"totalPages": paginator.num_pages,
+				"page": query.page_number,
+			})
+
+		return conditional_response(request, model, ("items", query.normalized_query), get_response)
 	
 	@api_view(['GET', 'POST'])
+	@renderer_classes(get_renderer_classes())
 	def items_view(request: Request):
 		"""Get all items or create a new item."""
 		match request.method:
@@ -164,12 +514,301 @@ def get_urlpatterns(
 			case 'POST':
 				return post_item_view(request)
 
+	async def aget_item_view(request: Request, pk: int):
+		"""Async version of `get_item_view`."""
+		fields = get_requested_fields(request)
+
+		if not access.public_fields.issuperset(fields):
+			if (field := access.first_invisible_field(fields, await aget_user_roles(request))) is not None:
+				return Response(status=403, data={"error": f"User does not have permission to view field {field}."})
+
+		async def get_response() -> Response:
+			Serializer = get_serializer(model, fields)
+			if convert := get_values_converter(model, tuple(Serializer.Meta.fields)):
+				values = await model.objects.filter(pk=pk).values(*Serializer.Meta.fields).afirst()
+				return Response(data=convert(values) if values else {})
+			item = await get_query_plan(model, tuple(fields)).apply(model.objects.filter(pk=pk)).afirst()
+			# serializers are synchronous and may query the database (e.g. for properties)
+			return Response(data=await sync_to_async(lambda: Serializer(item).data)() if item else {})
+
+		return await aconditional_response(request, model, ("item", pk, tuple(fields)), get_response)
+
+	async def apost_item_view(request: Request):
+		"""Async version of `post_item_view`."""
+		if not access.can_add(await aget_user_roles(request)):
+			return Response(status=403, data={"error": "User does not have permission to add items."})
+
+		Serializer = get_serializer(model, model_field_names)
+		def create() -> dict:
+			serializer = Serializer(data=request.data)
+			serializer.is_valid(raise_exception=True)
+			return Serializer(serializer.save()).data
+		data = await sync_to_async(create)()
+		await ainvalidate_model(model)
+		return Response(data=data)
+
+	async def apatch_item_view(request: Request, pk: int):
+		"""Async version of `patch_item_view`."""
+		if (field := access.first_unmodifiable_field(list(request.data.keys()), await aget_user_roles(request))) is not None: # type: ignore
+			return Response(status=403, data={"error": f"User does not have permission to modify field {field}."})
+
+		Serializer = get_serializer(model, model_field_names)
+		instance = await model.objects.filter(pk=pk).afirst()
+		def update() -> dict:
+			serializer = Serializer(instance, data=request.data, partial=True)
+			serializer.is_valid(raise_exception=True)
+			return Serializer(serializer.save()).data
+		data = await sync_to_async(update)()
+		await ainvalidate_model(model)
+		return Response(data=data)
+
+	async def adelete_item_view(request: Request, pk: int):
+		"""Async version of `delete_item_view`."""
+		if not access.can_remove(await aget_user_roles(request)):
+			return Response(status=403, data={"error": "User does not have permission to remove items."})
+
+		await model.objects.filter(pk=pk).adelete()
+		await ainvalidate_model(model)
+		return Response(status=204)
+
+	@async_api_view(['GET', 'PATCH', 'DELETE'], get_renderer_classes())
+	async def async_item_view(request: Request, pk: int):
+		"""Get, create, update or delete a single item."""
+		match request.method:
+			case 'GET':
+				return await aget_item_view(request, pk)
+			case 'PATCH':
+				return await apatch_item_view(request, pk)
+			case 'DELETE':
+				return await adelete_item_view(request, pk)
+
+	async def aget_items_view(request: Request):
+		"""Async version of `get_items_view`."""
+		query = ItemsQuery.parse(request)
+
+		if (error_response := check_query(query)) is not None:
+			return error_response
+
+		if not access.public_fields.issuperset(query.fields):
+			if (field := access.first_invisible_field(query.fields, await aget_user_roles(request))) is not None:
+				return Response(status=403, data={"error": f"User does not have permission to view field {field}."})
+
+		async def get_response() -> Response:
+			Serializer = get_serializer(model, query.fields)
+
+			if query.cursor_pagination:
+				query_plan = get_query_plan(model, tuple(query.fields) + ((query.sort_by,) if query.sort_by else ()))
+				query_set = query_plan.apply(model.objects.filter(**query.filters))
+				def get_page() -> tuple[list, str | None, str | None]:
+					items, next_cursor, prev_cursor = paginate_by_cursor(query_set, query.sort_by, query.sort_dir, query.cursor, query.page_size)
+					return Serializer(items, many=True).data, next_cursor, prev_cursor
+				try:
+					items_data, next_cursor, prev_cursor = await sync_to_async(get_page)()
+				except InvalidCursor as e:
+					return Response(status=400, data={"error": str(e)})
+				data = {
+					"items": items_data,
+					"nextCursor": next_cursor,
+					"prevCursor": prev_cursor,
+				}
+				if query.with_total:
+					data["totalItems"] = await query_set.acount()
+				return Response(data=data)
+
+			query_set = get_query_plan(model, tuple(query.fields)).apply(model.objects.filter(**query.filters)).order_by(query.get_ordering())
+			convert = get_values_converter(model, tuple(Serializer.Meta.fields))
+			if convert:
+				query_set = query_set.values(*Serializer.Meta.fields)
+			# paginate like `Paginator.get_page`, which shows the last page for page numbers out of range
+			total_items = await query_set.acount()
+			total_pages = max(1, -(-total_items // query.page_size))
+			page_number = query.page_number if 1 <= query.page_number <= total_pages else total_pages
+			page = query_set[(page_number - 1) * query.page_size:page_number * query.page_size]
+			if convert:
+				items_data = [convert(values) async for values in page]
+			else:
+				items = [item async for item in page]
+				items_data = await sync_to_async(lambda: Serializer(items, many=True).data)()
+			return Response(data={
+				"items": items_data,
+				"totalItems": total_items,
+				"totalPages": total_pages,
+				"page": query.page_number,
+			})
+
+		return await aconditional_response(request, model, ("items", query.normalized_query), get_response)
+
+	@async_api_view(['GET', 'POST'], get_renderer_classes())
+	async def async_items_view(request: Request):
+		"""Get all items or create a new item."""
+		match request.method:
+			case 'GET':
+				return await aget_items_view(request)
+			case 'POST':
+				return await apost_item_view(request)
+
+	@api_view(['GET'])
+	def export_view(request: Request):
+		"""Stream all items consisting of the given _fields and matching the filter query as NDJSON or CSV."""
+		# the query is parsed and checked like for the list of items, while its pagination parameters are ignored
+		query = ItemsQuery.parse(request)
+		export_format = query.filters.pop("_format", "ndjson")
+		if export_format not in ("ndjson", "csv"):
+			return Response(status=400, data={"error": f"Unsupported export format {export_format}."})
+
+		# check if the sorting and the filters are allowed, to prevent expensive queries
+		if (error_response := check_query(query)) is not None:
+			return error_response
+
+		# check if the user has permission to view the fields (the roles are only needed if not all fields are public)
+		fields = query.fields
+		if not access.public_fields.issuperset(fields):
+			if (field := access.first_invisible_field(fields, get_user_roles(request))) is not None:
+				return Response(status=403, data={"error": f"User does not have permission to view field {field}."})
+
+		query_set = get_query_plan(model, tuple(fields)).apply(model.objects.filter(**query.filters)).order_by(query.get_ordering())
+		Serializer = get_serializer(model, fields)
+		chunk_size = getattr(settings, "UI_MIGRATIONS_EXPORT_CHUNK_SIZE", 2000)
+		if export_format == "csv":
+			response = StreamingHttpResponse(stream_csv(query_set, Serializer, fields + ["pk"], chunk_size), content_type="text/csv")
+		else:
+			response = StreamingHttpResponse(stream_ndjson(query_set, Serializer, chunk_size), content_type="application/x-ndjson")
+		response["Content-Disposition"] = f'attachment; filename="{model.__name__.lower()}s.{export_format}"'
+		return response
+
+	@api_view(['POST'])
+	def bulk_view(request: Request):
+		"""Create, update and delete multiple items in one transaction."""
+		data = request.data
+		creates: list[dict] = data.get("create", []) if isinstance(data, dict) else None # type: ignore
+		updates: list[dict] = data.get("update", []) if isinstance(data, dict) else None # type: ignore
+		deletes: list = data.get("delete", []) if isinstance(data, dict) else None # type: ignore
+		if not all(isinstance(value, list) for value in (creates, updates, deletes)) or not all(isinstance(item, dict) and item.get("pk") is not None for item in updates):
+			return Response(status=400, data={"error": "Expected lists of items to create, items (with pk) to update and primary keys to delete."})
+		try:
+			update_pks = [model._meta.pk.to_python(item["pk"]) for item in updates] # type: ignore
+			delete_pks = [model._meta.pk.to_python(pk) for pk in deletes] # type: ignore
+		except (ValidationError, TypeError, ValueError):
+			return Response(status=400, data={"error": "Expected valid primary keys of the items to update and delete."})
+
+		# check the permissions once for the whole batch
+		roles = get_user_roles(request)
+		if creates and not access.can_add(roles):
+			return Response(status=403, data={"error": "User does not have permission to add items."})
+		if deletes and not access.can_remove(roles):
+			return Response(status=403, data={"error": "User does not have permission to remove items."})
+		requested_fields = list(dict.fromkeys(field for item in updates for field in item.keys() if field != "pk"))
+		if (field := access.first_unmodifiable_field(requested_fields, roles)) is not None:
+			return Response(status=403, data={"error": f"User does not have permission to modify field {field}."})
+
+		Serializer = get_serializer(model, model_field_names)
+
+		# validate all items before writing anything
+		creates_serializer = Serializer(data=creates, many=True)
+		if creates and not creates_serializer.is_valid():
+			return Response(status=400, data={"create": creates_serializer.errors})
+
+		with transaction.atomic():
+			# lock the items to update, so that concurrent changes of the fields that aren't updated here are kept
+			instances_to_update = model.objects.select_for_update().in_bulk(update_pks)
+			update_errors = {}
+			# only the validated columns of each item are written (e.g. not read-only fields or many to many relations), grouped by the updated columns
+			instances_by_fields: dict[tuple[str, ...], list[models.Model]] = {}
+			for item, pk in zip(updates, update_pks):
+				instance = instances_to_update.get(pk)
+				if instance is None:
+					update_errors[item["pk"]] = {"pk": [f"Item with pk {item['pk']} does not exist."]}
+					continue
+				update_serializer = Serializer(instance, data={key: value for key, value in item.items() if key != "pk"}, partial=True)
+				if not update_serializer.is_valid():
+					update_errors[item["pk"]] = update_serializer.errors
+					continue
+				validated_data: dict = update_serializer.validated_data # type: ignore
+				updated_fields = tuple(field for field in validated_data.keys() if field in updatable_field_names)
+				for field in updated_fields:
+					setattr(instance, field, validated_data[field])
+				if updated_fields:
+					instances_by_fields.setdefault(updated_fields, []).append(instance)
+			if update_errors:
+				return Response(status=400, data={"update": update_errors})
+
+			created_items = model.objects.bulk_create([model(**item) for item in creates_serializer.validated_data]) if creates else [] # type: ignore
+			for updated_fields, instances in instances_by_fields.items():
+				model.objects.bulk_update(instances, list(updated_fields))
+			# only count the deleted items of this model, not the deleted relations
+			deleted_count = model.objects.filter(pk__in=delete_pks).delete()[1].get(model._meta.label, 0) if delete_pks else 0
+		# bulk writes don't send signals, so the cache is invalidated explicitly
+		invalidate_model(model)
+
+		# fetch the created and updated items again to serialize them with their relations
+		query_set = get_query_plan(model, tuple(model_field_names)).apply(model.objects.all())
+		created_pks = [item.pk for item in created_items]
+		created_data = Serializer(sorted(query_set.filter(pk__in=created_pks), key=lambda item: created_pks.index(item.pk)), many=True).data
+		updated_data = Serializer(query_set.filter(pk__in=instances_to_update.keys()).order_by("pk"), many=True).data
+		# the deletions are published by the signals, but bulk creates and updates don't send any
+		if change_feed:
+			publish_changes(model, "create", created_data)
+			publish_changes(model, "update", updated_data)
+		return Response(data={
+			"created": created_data,
+			"updated": updated_data,
+			"deleted": deleted_count,
+		})
+
+	@api_view(['POST'])
+	def action_view(request: Request, component: str, index: int):
+		"""Run the server-side part of an action of a component on multiple items with a single query."""
+		actions = actions_updates.get(component, [])
+		if index < 0 or index >= len(actions):
+			return Response(status=404, data={"error": f"Component {component} has no action {index}."})
+		roles, updates = actions[index]
+		# check if the user has permission to run the action
+		if roles.isdisjoint(get_user_roles(request)):
+			return Response(status=403, data={"error": "User does not have permission to run this action."})
+		if not updates:
+			return Response(status=400, data={"error": "This action has no server-side part."})
+		pks = request.data.get("pks") if isinstance(request.data, dict) else None
+		if not isinstance(pks, list):
+			return Response(status=400, data={"error": "Expected a list of primary keys in pks."})
+		try:
+			pks = [model._meta.pk.to_python(pk) for pk in pks] # type: ignore
+		except (ValidationError, TypeError, ValueError):
+			return Response(status=400, data={"error": "Expected a list of primary keys in pks."})
+
+		updated_count = model.objects.filter(pk__in=pks).update(**updates)
+		invalidate_model(model)
+		# updates don't send signals, so the updated items are fetched again for the change feed
+		if change_feed:
+			query_set = get_query_plan(model, tuple(model_field_names)).apply(model.objects.filter(pk__in=pks))
+			publish_changes(model, "update", get_serializer(model, model_field_names)(query_set, many=True).data)
+		return Response(data={"updated": updated_count})
+
 	# Create URL patterns for the model using the name of the model:
-	# one for getting a single item and one for getting multiple items
-	return [
-		path(f"{model.__name__.lower()}s/<int:pk>", item_view),
-		path(f"{model.__name__.lower()}s", items_view),
+	# one for getting a single item, one for getting multiple items, one for exporting all items, one for changing multiple items at once and one for running actions
+	# (the views are only wrapped for measuring them if the instrumentation is enabled)
+	# the single item and the items are served by native async views if they are enabled (the others are rarely used and run in a thread under ASGI)
+	if is_async_views_enabled():
+		item_view, items_view = async_item_view, async_items_view
+	urlpatterns = [
+		path(f"{model.__name__.lower()}s/<int:pk>", instrument(item_view, model, "item")),
+		path(f"{model.__name__.lower()}s", instrument(items_view, model, "items")),
+		path(f"{model.__name__.lower()}s/export", instrument(export_view, model, "export")),
+		path(f"{model.__name__.lower()}s/bulk", instrument(bulk_view, model, "bulk")),
+		path(f"{model.__name__.lower()}s/actions/<str:component>/<int:index>", instrument(action_view, model, "action")),
 	]
+	# and one for streaming the changes of the items, which only contain the fields visible to the subscriber
+	if change_feed:
+		change_feed_view = create_change_feed_view(model, lambda request: access.visible_fields(get_user_roles(request)))
+		urlpatterns.append(path(f"{model.__name__.lower()}s/changes", change_feed_view))
+	return urlpatterns
+
+
+def get_components_from_module(ui_components_module) -> set[tuple[UiComponent, str]]:
+	"""Get the UI components declared in an app's `ui_components_module` with the path to their frontend as tuples."""
+	return {
+		(component, ui_components_module.frontends[component.ui_framework])
+		for component in ui_components_module.components
+	}
 
 
 def get_components_from_all_apps() -> set[tuple[UiComponent, str]]:
@@ -180,8 +819,7 @@ def get_components_from_all_apps() -> set[tuple[UiComponent, str]]:
 	for app_config in apps.get_app_configs():
 		try:
 			ui_components_module = importlib.import_module(f"{app_config.name}.ui_components")
-			for component in ui_components_module.components:
-				components_and_paths.add((component, ui_components_module.frontends[component.ui_framework]))
+			components_and_paths |= get_components_from_module(ui_components_module)
 		except ModuleNotFoundError:
 			pass
 	return components_and_paths
@@ -0,0 +1,96 @@
+import os
+import time
+
+try:
+	import inotify_simple
+except ImportError:
+	inotify_simple = None
+
+
+class FileWatcher:
+	"""Base class for watching a set of files for changes."""
+	def __init__(self, file_paths: set[str]):
+		"""Start watching the files at `file_paths` (absolute paths)."""
+		self.file_paths = file_paths
+	def wait(self, debounce: float) -> set[str]:
+		"""Block until any of the files changed and return the changed files, after no further changes happened for `debounce` seconds."""
+		...
+	def close(self) -> None:
+		"""Stop watching the files."""
+		pass
+
+
+class InotifyWatcher(FileWatcher):
+	"""Watches files with inotify (requires `inotify_simple`)."""
+	def __init__(self, file_paths: set[str]):
+		super().__init__(file_paths)
+		self.inotify = inotify_simple.INotify() # type: ignore
+		flags = inotify_simple.flags # type: ignore
+		# Editors often replace files instead of writing to them, so the directories are watched instead of the files
+		self.directories_by_watch: dict[int, str] = {}
+		try:
+			for directory in {os.path.dirname(file_path) for file_path in file_paths}:
+				watch = self.inotify.add_watch(directory, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.DELETE)
+				self.directories_by_watch[watch] = directory
+		except OSError:
+			self.inotify.close()
+			raise
+
+	def wait(self, debounce: float) -> set[str]:
+		changed_file_paths: set[str] = set()
+		timeout: int | None = None
+		while True:
+			events = self.inotify.read(timeout=timeout)
+			if not events and changed_file_paths:
+				return changed_file_paths
+			for event in events:
+				file_path = os.path.join(self.directories_by_watch.get(event.wd, ""), event.name)
+				if file_path in self.file_paths:
+					changed_file_paths.add(file_path)
+			if changed_file_paths:
+				timeout = int(debounce * 1000)
+
+	def close(self) -> None:
+		self.inotify.close()
+
+
+class PollingWatcher(FileWatcher):
+	"""Watches files by comparing their modification times and sizes in an interval."""
+	def __init__(self, file_paths: set[str], interval: float = 0.2):
+		super().__init__(file_paths)
+		self.interval = interval
+		self.stats = self.get_stats()
+
+	def get_stats(self) -> dict[str, tuple[int, int] | None]:
+		"""Get the modification time and size of every file (or `None` if it doesn't exist)."""
+		stats: dict[str, tuple[int, int] | None] = {}
+		for file_path in self.file_paths:
+			try:
+				stat = os.stat(file_path)
+				stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+			except FileNotFoundError:
+				stats[file_path] = None
+		return stats
+
+	def wait(self, debounce: float) -> set[str]:
+		changed_file_paths: set[str] = set()
+		last_change = 0.0
+		while not changed_file_paths or time.monotonic() - last_change < debounce:
+			time.sleep(min(self.interval, debounce) if changed_file_paths else self.interval)
+			stats = self.get_stats()
+			if changes := {file_path for file_path, stat in stats.items() if stat != self.stats[file_path]}:
+				changed_file_paths |= changes
+				last_change = time.monotonic()
+			self.stats = stats
+		return changed_file_paths
+
+
+def get_file_watcher(file_paths: set[str], polling: bool = False) -> FileWatcher:
+	"""Get a watcher for the files at `file_paths`, using inotify where available (unless `polling` is set) and polling otherwise."""
+	if inotify_simple is not None and not polling:
+		try:
+			return InotifyWatcher(file_paths)
+		except OSError:
+			# inotify is not supported by the system (or its limits are reached)
+			pass
+	return PollingWatcher(file_paths)